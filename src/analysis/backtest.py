@@ -6,16 +6,19 @@ It simulates trades and analyzes performance.
 """
 
 import logging
-from datetime import datetime, timedelta
+from concurrent.futures import CancelledError
+from datetime import timedelta
+import numpy as np
 import pandas as pd
 
-from src.utils.config import get_config
+from src.utils.config import get_config, get_pip_settings
 from src.utils.time_utils import (
     format_datetime_for_db, 
     format_display_date, 
     format_display_time,
     get_session_for_time,
-    combine_date_and_time
+    combine_date_and_time,
+    parse_db_datetime
 )
 from src.data.database import (
     get_candle_at_time,
@@ -26,7 +29,22 @@ from src.data.database import (
 
 logger = logging.getLogger(__name__)
 
-def backtest_trade(db_path, symbol, entry_data):
+# Equity simulation parameters
+STARTING_BALANCE = 100  # Start with 100 units
+RISK_PERCENT = 2  # Risk 2% per trade
+
+# (summary key, result field, skip empty values) for summarize_backtest_results
+SUMMARY_GROUPS = (
+    ('by_stoploss', 'StoplossSize', False),
+    ('by_ratio', 'TradeRatio', False),
+    ('by_session', 'session', False),
+    ('by_h4', 'H4', True),
+    ('by_h1', 'H1', True),
+    ('by_m15', 'M15', True),
+    ('by_entry_point', 'EntryPoint', True)
+)
+
+def backtest_trade(db_path, symbol, entry_data, cancel_event=None, config=None, pip_settings=None):
     """
     Backtest a single trade with the given parameters.
     
@@ -34,6 +52,12 @@ def backtest_trade(db_path, symbol, entry_data):
         db_path (str): Path to the database file
         symbol (str): The trading symbol
         entry_data (dict): Entry data including date, time, position, etc.
+        cancel_event (Event, optional): Checked before each stop loss / ratio
+            scenario; once set the backtest stops by raising CancelledError
+        config (dict, optional): Configuration to use instead of get_config(), so a
+            worker process does not read a settings file that may not be saved yet
+        pip_settings (tuple, optional): (pip multiplier, currency ratio) to use
+            instead of get_pip_settings(symbol)
         
     Returns:
         dict: Results of the backtest including performance metrics
@@ -41,15 +65,13 @@ def backtest_trade(db_path, symbol, entry_data):
     logger.info(f"Backtesting trade for {symbol} on {entry_data.get('day')} at {entry_data.get('OpenTime')}")
     
     try:
-        config = get_config()
+        if config is None:
+            config = get_config()
         
-        # Get pip multiplier for the symbol
-        pip_multipliers = config['trading']['pips_multiplication']
-        ratio_pips = pip_multipliers.get(symbol, 10000)
-        
-        # Get currency ratio for price calculation
-        currency_ratios = config['trading']['currency_ratios']
-        ratiopips = currency_ratios.get(symbol, 0.0001)
+        # Get pip multiplier and currency ratio for the symbol
+        if pip_settings is None:
+            pip_settings = get_pip_settings(symbol)
+        ratio_pips, ratiopips = pip_settings
         
         # Get day and time info
         day_open = entry_data.get('day')
@@ -91,6 +113,9 @@ def backtest_trade(db_path, symbol, entry_data):
         
         for stoploss_size in stoploss_sizes:
             for ratio in trade_ratios:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise CancelledError("Backtest cancelled")
+                
                 stoploss_price = stoploss_size * ratiopips
                 
                 if position == 'Buy':
@@ -128,7 +153,7 @@ def backtest_trade(db_path, symbol, entry_data):
                             found_result = True
                     
                     if found_result:
-                        day_close_datetime = datetime.strptime(candle_time, '%Y-%m-%d %H:%M:%S')
+                        day_close_datetime = parse_db_datetime(candle_time)
                         
                         # Format for display
                         day_close_str = format_display_date(day_close_datetime)
@@ -185,13 +210,16 @@ def backtest_trade(db_path, symbol, entry_data):
         
         return results
     
+    except CancelledError:
+        logger.info(f"Backtest for {symbol} cancelled")
+        raise
     except Exception as e:
         logger.error(f"Error in backtest_trade: {e}")
         import traceback
         logger.error(traceback.format_exc())
         return None
 
-def batch_backtest(db_path, symbol, entries):
+def batch_backtest(db_path, symbol, entries, progress_callback=None, cancel_event=None):
     """
     Run a batch of backtests for multiple entries.
     
@@ -199,6 +227,11 @@ def batch_backtest(db_path, symbol, entries):
         db_path (str): Path to the database file
         symbol (str): The trading symbol
         entries (list): List of entry data dictionaries
+        progress_callback (callable, optional): Called as
+            progress_callback(done, total, results_so_far) every
+            gui.plot_refresh_stride entries and once at the end, so a live
+            plot is not redrawn for every scenario
+        cancel_event (Event, optional): Passed to backtest_trade to stop the batch
         
     Returns:
         dict: Aggregated results of all backtests
@@ -206,11 +239,17 @@ def batch_backtest(db_path, symbol, entries):
     logger.info(f"Running batch backtest for {symbol} with {len(entries)} entries")
     
     all_results = []
+    total = len(entries)
+    stride = max(1, get_config()['gui'].get('plot_refresh_stride', 10))
     
-    for entry in entries:
-        result = backtest_trade(db_path, symbol, entry)
+    for done, entry in enumerate(entries, 1):
+        result = backtest_trade(db_path, symbol, entry, cancel_event)
         if result:
             all_results.extend(result)
+        
+        # Report progress only every stride entries
+        if progress_callback and (done % stride == 0 or done == total):
+            progress_callback(done, total, all_results)
     
     # Calculate summary statistics
     summary = summarize_backtest_results(all_results)
@@ -247,96 +286,39 @@ def summarize_backtest_results(results):
             'by_entry_point': {}
         }
     
-    # Count overall statistics
+    # Count overall statistics from outcome masks
     total_trades = len(results)
-    winning_trades = sum(1 for r in results if r.get('Result') == 'Winning')
-    losing_trades = sum(1 for r in results if r.get('Result') == 'Losing')
-    inconclusive_trades = sum(1 for r in results if r.get('Result') == 'Inconclusive')
+    outcomes = np.array([r.get('Result') for r in results], dtype=object)
+    wins = outcomes == 'Winning'
+    inconclusive = outcomes == 'Inconclusive'
+    winning_trades = int(wins.sum())
+    losing_trades = int((outcomes == 'Losing').sum())
+    inconclusive_trades = int(inconclusive.sum())
     
     win_rate = (winning_trades / (winning_trades + losing_trades)) * 100 if (winning_trades + losing_trades) > 0 else 0
     
     # Calculate average duration (excluding inconclusive trades)
-    durations = [r.get('duration_hours', 0) for r in results if r.get('Result') != 'Inconclusive' and r.get('duration_hours', 0) > 0]
-    average_duration = sum(durations) / len(durations) if durations else 0
-    
-    # Group results by different parameters
-    by_stoploss = {}
-    by_ratio = {}
-    by_session = {}
-    by_h4 = {}
-    by_h1 = {}
-    by_m15 = {}
-    by_entry_point = {}
-    
-    for result in results:
-        # Skip inconclusive results for win rate calculations
-        if result.get('Result') == 'Inconclusive':
-            continue
-        
-        # By stop loss size
-        sl_size = result.get('StoplossSize')
-        if sl_size not in by_stoploss:
-            by_stoploss[sl_size] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        by_stoploss[sl_size]['total'] += 1
-        if result.get('Result') == 'Winning':
-            by_stoploss[sl_size]['wins'] += 1
-        
-        # By trade ratio
-        ratio = result.get('TradeRatio')
-        if ratio not in by_ratio:
-            by_ratio[ratio] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        by_ratio[ratio]['total'] += 1
-        if result.get('Result') == 'Winning':
-            by_ratio[ratio]['wins'] += 1
-        
-        # By session
-        session = result.get('session')
-        if session not in by_session:
-            by_session[session] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        by_session[session]['total'] += 1
-        if result.get('Result') == 'Winning':
-            by_session[session]['wins'] += 1
-        
-        # By H4 trend
-        h4 = result.get('H4')
-        if h4 and h4 not in by_h4:
-            by_h4[h4] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        if h4:
-            by_h4[h4]['total'] += 1
-            if result.get('Result') == 'Winning':
-                by_h4[h4]['wins'] += 1
-        
-        # By H1 trend
-        h1 = result.get('H1')
-        if h1 and h1 not in by_h1:
-            by_h1[h1] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        if h1:
-            by_h1[h1]['total'] += 1
-            if result.get('Result') == 'Winning':
-                by_h1[h1]['wins'] += 1
-        
-        # By M15 structure
-        m15 = result.get('M15')
-        if m15 and m15 not in by_m15:
-            by_m15[m15] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        if m15:
-            by_m15[m15]['total'] += 1
-            if result.get('Result') == 'Winning':
-                by_m15[m15]['wins'] += 1
-        
-        # By entry point
-        entry_point = result.get('EntryPoint')
-        if entry_point and entry_point not in by_entry_point:
-            by_entry_point[entry_point] = {'total': 0, 'wins': 0, 'win_rate': 0}
-        if entry_point:
-            by_entry_point[entry_point]['total'] += 1
-            if result.get('Result') == 'Winning':
-                by_entry_point[entry_point]['wins'] += 1
+    durations = np.fromiter((r.get('duration_hours', 0) for r in results), dtype=float, count=total_trades)
+    timed = ~inconclusive & (durations > 0)
+    average_duration = float(durations[timed].mean()) if timed.any() else 0
+    
+    # Group decided results by each parameter in a single pass
+    groups = {name: {} for name, _, _ in SUMMARY_GROUPS}
+    for index in np.flatnonzero(~inconclusive).tolist():
+        result = results[index]
+        is_win = int(wins[index])
+        for name, field, skip_empty in SUMMARY_GROUPS:
+            value = result.get(field)
+            if skip_empty and not value:
+                continue
+            bucket = groups[name].setdefault(value, {'total': 0, 'wins': 0, 'win_rate': 0})
+            bucket['total'] += 1
+            bucket['wins'] += is_win
     
     # Calculate win rates for each group
-    for group in [by_stoploss, by_ratio, by_session, by_h4, by_h1, by_m15, by_entry_point]:
-        for key in group:
-            group[key]['win_rate'] = (group[key]['wins'] / group[key]['total']) * 100 if group[key]['total'] > 0 else 0
+    for group in groups.values():
+        for bucket in group.values():
+            bucket['win_rate'] = (bucket['wins'] / bucket['total']) * 100
     
     return {
         'total_trades': total_trades,
@@ -345,13 +327,7 @@ def summarize_backtest_results(results):
         'inconclusive_trades': inconclusive_trades,
         'win_rate': win_rate,
         'average_duration': average_duration,
-        'by_stoploss': by_stoploss,
-        'by_ratio': by_ratio,
-        'by_session': by_session,
-        'by_h4': by_h4,
-        'by_h1': by_h1,
-        'by_m15': by_m15,
-        'by_entry_point': by_entry_point
+        **groups
     }
 
 def check_news_for_entry(db_path, start_datetime, hours_before=6, hours_after=6):
@@ -369,77 +345,105 @@ def check_news_for_entry(db_path, start_datetime, hours_before=6, hours_after=6)
     """
     return get_news_around_time(db_path, start_datetime, hours_before, hours_after)
 
+def _prepare_closed_trades(results):
+    """
+    Build a chronologically sorted frame of closed trades with their P&L.
+    
+    Args:
+        results (list or DataFrame): Trade results as dictionaries or a DataFrame
+        
+    Returns:
+        DataFrame: Closed trades (inconclusive ones removed) with a 'balance' column
+    """
+    df = results.copy() if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+    
+    for col in ('StartDatetime', 'EndDatetime', 'Result', 'TradeRatio', 'StoplossSize', 'position'):
+        if col not in df.columns:
+            df[col] = None
+    
+    if df.empty:
+        df['balance'] = pd.Series(dtype=float)
+        return df
+    
+    # Sort by start datetime and skip inconclusive results
+    order = df['StartDatetime'].fillna('').to_numpy().argsort(kind='stable')
+    df = df.iloc[order]
+    df = df[df['Result'] != 'Inconclusive'].reset_index(drop=True)
+    
+    # Reward multiple from the '1:N' trade ratio
+    ratio_str = df['TradeRatio'].fillna('1:1').astype(str)
+    ratio = np.where(
+        ratio_str.str.contains(':', regex=False),
+        pd.to_numeric(ratio_str.str.split(':').str[1], errors='coerce'),
+        1.0
+    )
+    
+    # Winning trades earn risk * ratio, everything else loses the risked amount
+    pnl = np.where(df['Result'].to_numpy() == 'Winning', RISK_PERCENT * ratio, -RISK_PERCENT)
+    df['balance'] = STARTING_BALANCE + np.cumsum(pnl)
+    return df
+
 def calculate_drawdown(results):
     """
     Calculate maximum drawdown based on a series of trade results.
     
     Args:
-        results (list): List of trade result dictionaries
+        results (list or DataFrame): Trade results as dictionaries or a DataFrame
         
     Returns:
         dict: Drawdown metrics
     """
-    # Sort results by start datetime
-    sorted_results = sorted(results, key=lambda x: x.get('StartDatetime', ''))
-    
-    # Initialize tracking variables
-    balance = 100  # Start with 100 units
-    peak_balance = 100
-    current_drawdown = 0
-    max_drawdown = 0
-    max_drawdown_start = None
-    max_drawdown_end = None
+    trades = _prepare_closed_trades(results)
+    balance = trades['balance'].to_numpy(dtype=float)
+    starts = trades['StartDatetime'].tolist()
+    ends = trades['EndDatetime'].tolist()
+    
+    if len(balance) == 0:
+        return {
+            'max_drawdown_percent': 0,
+            'max_drawdown_start': None,
+            'max_drawdown_end': None,
+            'final_balance': STARTING_BALANCE,
+            'peak_balance': STARTING_BALANCE,
+            'drawdown_periods': []
+        }
+    
+    # Running peak before and after each trade, and the drawdown from it
+    peak = np.maximum.accumulate(np.maximum(balance, STARTING_BALANCE))
+    peak_before = np.concatenate(([STARTING_BALANCE], peak[:-1]))
+    drawdown = (peak - balance) / peak * 100
+    
+    # Trades that set a new overall maximum drawdown
+    previous_max = np.concatenate(([0.0], np.maximum.accumulate(drawdown)[:-1]))
+    new_max = np.flatnonzero(drawdown > previous_max)
+    
+    # Trades reaching a new peak while the previous trade was in drawdown end a period
+    previous_drawdown = np.concatenate(([0.0], drawdown[:-1]))
+    recoveries = np.flatnonzero((balance > peak_before) & (previous_drawdown > 0))
+    
+    # A period starts at the first new maximum drawdown since the previous recovery
     drawdown_periods = []
+    segment_start = 0
+    for recovery in recoveries.tolist():
+        first = np.searchsorted(new_max, segment_start)
+        start = starts[new_max[first]] if first < len(new_max) and new_max[first] < recovery else None
+        drawdown_periods.append({
+            'start': start,
+            'end': ends[recovery],
+            'depth': float(previous_drawdown[recovery]),
+            'recovery_trades': 1  # Simplified
+        })
+        segment_start = recovery + 1
     
-    for result in sorted_results:
-        # Skip inconclusive results
-        if result.get('Result') == 'Inconclusive':
-            continue
-        
-        # Get risk-reward details
-        sl_size = float(result.get('StoplossSize', 0))
-        ratio_str = result.get('TradeRatio', '1:1')
-        ratio = float(ratio_str.split(':')[1]) if ':' in ratio_str else 1
-        
-        # Calculate profit/loss
-        risk_percent = 2  # Risk 2% per trade
-        if result.get('Result') == 'Winning':
-            profit_percent = risk_percent * ratio
-            balance += profit_percent
-        else:  # Losing
-            balance -= risk_percent
-        
-        # Update peak balance
-        if balance > peak_balance:
-            peak_balance = balance
-            
-            # If we were in a drawdown, record it
-            if current_drawdown > 0:
-                drawdown_periods.append({
-                    'start': max_drawdown_start,
-                    'end': result.get('EndDatetime'),
-                    'depth': current_drawdown,
-                    'recovery_trades': 1  # Simplified
-                })
-                current_drawdown = 0
-                max_drawdown_start = None
-        
-        # Calculate current drawdown
-        current_drawdown = (peak_balance - balance) / peak_balance * 100
-        
-        # Update max drawdown if needed
-        if current_drawdown > max_drawdown:
-            max_drawdown = current_drawdown
-            if max_drawdown_start is None:
-                max_drawdown_start = result.get('StartDatetime')
-            max_drawdown_end = result.get('EndDatetime')
+    first = np.searchsorted(new_max, segment_start)
+    max_drawdown_start = starts[new_max[first]] if first < len(new_max) else None
     
     return {
-        'max_drawdown_percent': max_drawdown,
+        'max_drawdown_percent': float(drawdown.max()) if len(new_max) else 0,
         'max_drawdown_start': max_drawdown_start,
-        'max_drawdown_end': max_drawdown_end,
-        'final_balance': balance,
-        'peak_balance': peak_balance,
+        'max_drawdown_end': ends[new_max[-1]] if len(new_max) else None,
+        'final_balance': float(balance[-1]),
+        'peak_balance': float(peak[-1]),
         'drawdown_periods': drawdown_periods
     }
 
@@ -448,49 +452,21 @@ def generate_equity_curve(results):
     Generate an equity curve from a series of trade results.
     
     Args:
-        results (list): List of trade result dictionaries
+        results (list or DataFrame): Trade results as dictionaries or a DataFrame
         
     Returns:
         DataFrame: Equity curve data
     """
-    # Sort results by start datetime
-    sorted_results = sorted(results, key=lambda x: x.get('StartDatetime', ''))
-    
-    # Initialize data for equity curve
-    equity_data = []
-    balance = 100  # Start with 100 units
-    
-    for result in sorted_results:
-        # Skip inconclusive results
-        if result.get('Result') == 'Inconclusive':
-            continue
-        
-        # Get risk-reward details
-        sl_size = float(result.get('StoplossSize', 0))
-        ratio_str = result.get('TradeRatio', '1:1')
-        ratio = float(ratio_str.split(':')[1]) if ':' in ratio_str else 1
-        
-        # Calculate profit/loss
-        risk_percent = 2  # Risk 2% per trade
-        if result.get('Result') == 'Winning':
-            profit_percent = risk_percent * ratio
-            balance += profit_percent
-        else:  # Losing
-            balance -= risk_percent
-        
-        # Add point to equity curve
-        equity_data.append({
-            'datetime': result.get('EndDatetime'),
-            'balance': balance,
-            'trade_result': result.get('Result'),
-            'position': result.get('position'),
-            'stoploss': result.get('StoplossSize'),
-            'ratio': result.get('TradeRatio')
-        })
+    trades = _prepare_closed_trades(results)
     
-    # Convert to DataFrame
-    if equity_data:
-        df = pd.DataFrame(equity_data)
-        return df
-    else:
+    if trades.empty:
         return pd.DataFrame(columns=['datetime', 'balance', 'trade_result', 'position', 'stoploss', 'ratio'])
+    
+    return pd.DataFrame({
+        'datetime': trades['EndDatetime'],
+        'balance': trades['balance'],
+        'trade_result': trades['Result'],
+        'position': trades['position'],
+        'stoploss': trades['StoplossSize'],
+        'ratio': trades['TradeRatio']
+    })
@@ -14,6 +14,41 @@ from src.utils.config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Workbook formats openpyxl can read in read-only mode
+_READ_ONLY_EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+def _read_news_excel(excel_path):
+    """
+    Read the news workbook into a DataFrame.
+    
+    .xlsx/.xlsm files are parsed with openpyxl in read-only mode, which is faster
+    than pd.read_excel. All rows are still collected into one DataFrame, so memory
+    grows with the sheet. Other formats, or a read failure, fall back to
+    pd.read_excel.
+    
+    Args:
+        excel_path (str): Path to the Excel file
+        
+    Returns:
+        DataFrame: The first worksheet, using its first row as the header
+    """
+    if excel_path.lower().endswith(_READ_ONLY_EXCEL_EXTENSIONS):
+        try:
+            import openpyxl
+            
+            wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+            try:
+                rows = wb.active.iter_rows(values_only=True)
+                header = next(rows, ())
+                data = [row for row in rows if any(value is not None for value in row)]
+            finally:
+                wb.close()
+            return pd.DataFrame(data, columns=header)
+        except Exception as e:
+            logger.warning(f"openpyxl read of {excel_path} failed, falling back to pandas: {e}")
+    
+    return pd.read_excel(excel_path)
+
 def import_news_from_excel(excel_path, db_path):
     """
     Import news data from an Excel file into the database.
@@ -34,7 +69,7 @@ def import_news_from_excel(excel_path, db_path):
             return False
         
         # Read the Excel file
-        df = pd.read_excel(excel_path)
+        df = _read_news_excel(excel_path)
         
         # Check if the required columns are present
         required_columns = ['time', 'impact', 'currency', 'news']
@@ -8,14 +8,112 @@ creation, querying, and maintenance.
 import os
 import logging
 import sqlite3
+import threading
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from src.utils.config import get_config
-from src.utils.time_utils import format_datetime_for_db, normalize_time_for_m15
+from src.utils.config import get_config, get_pip_settings
+from src.utils.time_utils import format_datetime_for_db, normalize_time_for_m15, parse_db_datetime
 
 logger = logging.getLogger(__name__)
 
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+"""
+
+def configure_connection(conn):
+    """
+    Apply WAL journaling and read performance settings to a connection.
+    
+    journal_mode=WAL is stored in the database file itself: once opened here, a
+    database stays in WAL mode and keeps -wal/-shm files beside it while in use.
+    
+    Args:
+        conn (sqlite3.Connection): The connection to configure
+        
+    Returns:
+        sqlite3.Connection: The same connection, for chaining
+    """
+    conn.executescript(CONNECTION_PRAGMAS)
+    return conn
+
+TRADING_ENTRY_INDEXES = {
+    'idx_result_start': "CREATE INDEX IF NOT EXISTS idx_result_start ON trading_entries(Result, StartDatetime)",
+    'idx_position_result': "CREATE INDEX IF NOT EXISTS idx_position_result ON trading_entries(position, Result)"
+}
+
+_thread_local = threading.local()
+
+def get_connection(db_path):
+    """
+    Get this thread's cached connection to a database, opening it on first use.
+    
+    Each thread keeps one connection, to the database it used last, so repeated
+    queries skip the connect and PRAGMA setup. Asking for a different database
+    closes the old handle first. Callers must not close the connection
+    themselves; use close_connection when the thread is done with it.
+    
+    Args:
+        db_path (str): Path to the database file
+        
+    Returns:
+        sqlite3.Connection: The configured connection
+    """
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is not None and _thread_local.db_path != db_path:
+        conn.close()
+        conn = None
+    
+    if conn is None:
+        conn = configure_connection(sqlite3.connect(db_path))
+        _thread_local.conn = conn
+        _thread_local.db_path = db_path
+    return conn
+
+def close_connection():
+    """Close the calling thread's cached connection, if it has one."""
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _thread_local.conn = None
+        _thread_local.db_path = None
+
+def ensure_indexes(conn):
+    """
+    Create the trading_entries indexes used by the analysis and export queries.
+    
+    The table is analyzed the first time the indexes are created so the
+    query planner picks them up.
+    
+    Args:
+        conn (sqlite3.Connection): An open database connection
+    """
+    has_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trading_entries'"
+    ).fetchone()
+    if not has_table:
+        return
+    
+    existing = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name IN ({', '.join('?' for _ in TRADING_ENTRY_INDEXES)})",
+        tuple(TRADING_ENTRY_INDEXES)
+    ).fetchone()[0]
+    
+    if existing < len(TRADING_ENTRY_INDEXES):
+        try:
+            for statement in TRADING_ENTRY_INDEXES.values():
+                conn.execute(statement)
+            conn.execute("ANALYZE trading_entries")
+            conn.commit()
+            logger.info("Created trading_entries indexes")
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.warning(f"Could not create trading_entries indexes: {e}")
+
 def get_db_path(symbol):
     """
     Get the database path for a specific symbol.
@@ -106,6 +204,7 @@ def init_db(db_path):
     ''')
     
     conn.commit()
+    ensure_indexes(conn)
     conn.close()
     logger.info("Database initialized successfully")
 
@@ -271,9 +370,8 @@ def get_candle_at_time(db_path, symbol, timeframe, time_str):
     logger.debug(f"Getting {timeframe} candle for {symbol} at {time_str}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # This enables column access by name
-        c = conn.cursor()
+        c = get_connection(db_path).cursor()
+        c.row_factory = sqlite3.Row  # This enables column access by name
         
         # Query for the candle
         c.execute(f'''
@@ -282,7 +380,6 @@ def get_candle_at_time(db_path, symbol, timeframe, time_str):
         ''', (symbol, time_str))
         
         row = c.fetchone()
-        conn.close()
         
         if row:
             # Convert the row to a dictionary
@@ -295,8 +392,6 @@ def get_candle_at_time(db_path, symbol, timeframe, time_str):
             
     except Exception as e:
         logger.error(f"Error getting candle data: {e}")
-        if conn:
-            conn.close()
         return None
 
 def get_subsequent_candles(db_path, symbol, timeframe, start_time, limit=None):
@@ -316,9 +411,8 @@ def get_subsequent_candles(db_path, symbol, timeframe, start_time, limit=None):
     logger.debug(f"Getting subsequent {timeframe} candles for {symbol} after {start_time}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
+        c = get_connection(db_path).cursor()
+        c.row_factory = sqlite3.Row
         
         # Build query based on whether a limit is provided
         query = f'''
@@ -340,15 +434,11 @@ def get_subsequent_candles(db_path, symbol, timeframe, start_time, limit=None):
         rows = c.fetchall()
         candles = [dict(row) for row in rows]
         
-        conn.close()
-        
         logger.debug(f"Found {len(candles)} subsequent candles")
         return candles
             
     except Exception as e:
         logger.error(f"Error getting subsequent candles: {e}")
-        if conn:
-            conn.close()
         return []
 
 def get_candles_in_range(db_path, symbol, timeframe, start_time, end_time):
@@ -368,9 +458,8 @@ def get_candles_in_range(db_path, symbol, timeframe, start_time, end_time):
     logger.debug(f"Getting {timeframe} candles for {symbol} between {start_time} and {end_time}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
+        c = get_connection(db_path).cursor()
+        c.row_factory = sqlite3.Row
         
         # Query for candles in range
         c.execute(f'''
@@ -383,15 +472,11 @@ def get_candles_in_range(db_path, symbol, timeframe, start_time, end_time):
         rows = c.fetchall()
         candles = [dict(row) for row in rows]
         
-        conn.close()
-        
         logger.debug(f"Found {len(candles)} candles in range")
         return candles
             
     except Exception as e:
         logger.error(f"Error getting candles in range: {e}")
-        if conn:
-            conn.close()
         return []
 
 def get_news_around_time(db_path, time_obj, hours_before=6, hours_after=6):
@@ -416,9 +501,8 @@ def get_news_around_time(db_path, time_obj, hours_before=6, hours_after=6):
     logger.debug(f"Getting news between {time_before_str} and {time_after_str}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
+        c = get_connection(db_path).cursor()
+        c.row_factory = sqlite3.Row
         
         # Query for news in range
         c.execute('''
@@ -431,15 +515,11 @@ def get_news_around_time(db_path, time_obj, hours_before=6, hours_after=6):
         rows = c.fetchall()
         news_events = [dict(row) for row in rows]
         
-        conn.close()
-        
         logger.debug(f"Found {len(news_events)} news events")
         return news_events
             
     except Exception as e:
         logger.error(f"Error getting news events: {e}")
-        if conn:
-            conn.close()
         return []
 
 def get_similar_news(db_path, news_name, before_time):
@@ -459,9 +539,8 @@ def get_similar_news(db_path, news_name, before_time):
     logger.debug(f"Getting similar news '{news_name}' before {before_time_str}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
+        c = get_connection(db_path).cursor()
+        c.row_factory = sqlite3.Row
         
         # Query for similar news
         c.execute('''
@@ -474,17 +553,56 @@ def get_similar_news(db_path, news_name, before_time):
         rows = c.fetchall()
         news_events = [dict(row) for row in rows]
         
-        conn.close()
-        
         logger.debug(f"Found {len(news_events)} similar news events")
         return news_events
             
     except Exception as e:
         logger.error(f"Error getting similar news: {e}")
-        if conn:
-            conn.close()
         return []
 
+RECENT_ENTRIES_SQL = '''
+    SELECT id, day, OpenTime, position, Result, TradeRatio, StoplossSize
+    FROM trading_entries
+    ORDER BY id DESC
+    LIMIT ?
+'''
+
+RECENT_ENTRIES_SINCE_SQL = '''
+    SELECT id, day, OpenTime, position, Result, TradeRatio, StoplossSize
+    FROM trading_entries
+    WHERE id > ?
+    ORDER BY id DESC
+    LIMIT ?
+'''
+
+def get_recent_entries(db_path, limit=50, conn=None, since_id=None):
+    """
+    Get the most recent trading entries for display.
+    
+    Args:
+        db_path (str): Path to the database file
+        limit (int, optional): Maximum number of entries to return
+        conn (sqlite3.Connection, optional): An open connection to use instead
+            of this thread's cached connection to db_path
+        since_id (int, optional): Only return entries with an id greater than this
+        
+    Returns:
+        list: A list of (id, day, OpenTime, position, Result, TradeRatio, StoplossSize) tuples
+    """
+    logger.debug(f"Getting {limit} most recent trading entries")
+    
+    if conn is None:
+        conn = get_connection(db_path)
+    
+    # Fetch all display columns in a single query
+    if since_id is None:
+        rows = conn.execute(RECENT_ENTRIES_SQL, (limit,)).fetchall()
+    else:
+        rows = conn.execute(RECENT_ENTRIES_SINCE_SQL, (since_id, limit)).fetchall()
+    
+    logger.debug(f"Found {len(rows)} recent entries")
+    return rows
+
 def get_trading_statistics(db_path, filters=None):
     """
     Get trading statistics from the database.
@@ -499,8 +617,7 @@ def get_trading_statistics(db_path, filters=None):
     logger.info(f"Getting trading statistics with filters: {filters}")
     
     try:
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        c = get_connection(db_path).cursor()
         
         # Base query
         query = "SELECT * FROM trading_entries"
@@ -530,8 +647,6 @@ def get_trading_statistics(db_path, filters=None):
             entry = dict(zip(column_names, row))
             entries.append(entry)
         
-        conn.close()
-        
         # Calculate statistics
         total_entries = len(entries)
         winning_entries = sum(1 for entry in entries if entry['Result'] == 'Winning')
@@ -600,8 +715,6 @@ def get_trading_statistics(db_path, filters=None):
             
     except Exception as e:
         logger.error(f"Error getting trading statistics: {e}")
-        if conn:
-            conn.close()
         return {
             'total_entries': 0,
             'winning_entries': 0,
@@ -609,6 +722,60 @@ def get_trading_statistics(db_path, filters=None):
             'error': str(e)
         }
 
+def get_win_rate_breakdowns(db_path, filters=None):
+    """
+    Get win rates grouped by stop loss, ratio, session and position in one query.
+    
+    Args:
+        db_path (str): Path to the database file
+        filters (dict, optional): Filters to apply to the query
+        
+    Returns:
+        dict: Facet name ('stoploss', 'ratio', 'session', 'position') mapped to
+            {bucket: {'total': int, 'wins': int, 'win_rate': float}}, plus an
+            'error' message if the query failed
+    """
+    logger.info(f"Getting win rate breakdowns with filters: {filters}")
+    
+    facets = (
+        ('stoploss', 'StoplossSize'),
+        ('ratio', 'TradeRatio'),
+        ('session', 'session'),
+        ('position', 'position')
+    )
+    breakdowns = {facet: {} for facet, _ in facets}
+    
+    try:
+        conn = get_connection(db_path)
+        
+        # Filter once in a CTE, then aggregate every facet from it
+        conditions = []
+        params = []
+        for key, value in (filters or {}).items():
+            if value:
+                conditions.append(f"{key} = ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        
+        grouped = " UNION ALL ".join(
+            f"SELECT '{facet}', {column}, COALESCE(SUM(Result = 'Winning'), 0), COUNT(*) FROM filtered GROUP BY {column}"
+            for facet, column in facets
+        )
+        query = f"WITH filtered AS (SELECT * FROM trading_entries{where}) {grouped}"
+        
+        for facet, bucket, wins, total in conn.execute(query, params):
+            breakdowns[facet][bucket] = {
+                'total': total,
+                'wins': wins,
+                'win_rate': wins / total * 100 if total else 0
+            }
+        
+        return breakdowns
+    except Exception as e:
+        logger.error(f"Error getting win rate breakdowns: {e}")
+        breakdowns['error'] = str(e)
+        return breakdowns
+
 def calculate_pips_movement(db_path, news_events):
     """
     Calculate price movement after news events.
@@ -627,16 +794,14 @@ def calculate_pips_movement(db_path, news_events):
     symbol = base_name.replace('trading_data_', '').replace('.db', '')
     
     # Get pip multiplication factor from config
-    config = get_config()
-    pip_multipliers = config['trading']['pips_multiplication']
-    ratio_pips = pip_multipliers.get(symbol, 10000)
+    ratio_pips, _ = get_pip_settings(symbol)
     
     try:
         conn = sqlite3.connect(db_path)
         
         # Process each news event
         for event in news_events:
-            news_time = datetime.strptime(event['time'], '%Y-%m-%d %H:%M:%S')
+            news_time = parse_db_datetime(event['time'])
             
             # Get the candle before the news
             candle_before_query = f"""
@@ -6,6 +6,7 @@ including connection, initialization, and data retrieval.
 """
 
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
@@ -19,9 +20,14 @@ except ImportError:
 
 from src.utils.config import get_config
 from src.data.database import insert_candle_data, init_db
+from src.utils.time_utils import get_mt5_timezone
 
 logger = logging.getLogger(__name__)
 
+# Zones used to resolve the broker server offset
+_PARIS_TZ = pytz.timezone('Europe/Paris')
+_BROKER_SUMMER_TZ = pytz.timezone('Etc/GMT-3')
+_BROKER_WINTER_TZ = pytz.timezone('Etc/GMT-2')
 
 def get_broker_timezone_for_date(date_obj):
     """
@@ -38,26 +44,52 @@ def get_broker_timezone_for_date(date_obj):
     Returns:
         pytz.timezone: The broker timezone for that date
     """
-    paris_tz = pytz.timezone('Europe/Paris')
-
     try:
         if date_obj.tzinfo is None:
-            paris_date = paris_tz.localize(date_obj)
+            paris_date = _PARIS_TZ.localize(date_obj)
         else:
-            paris_date = date_obj.astimezone(paris_tz)
+            paris_date = date_obj.astimezone(_PARIS_TZ)
 
         is_dst = bool(paris_date.dst())
 
         if is_dst:
             # Summer: Paris = UTC+2, broker = UTC+3
-            return pytz.timezone('Etc/GMT-3')
+            return _BROKER_SUMMER_TZ
         else:
             # Winter: Paris = UTC+1, broker = UTC+2
-            return pytz.timezone('Etc/GMT-2')
+            return _BROKER_WINTER_TZ
 
     except Exception as e:
         logger.warning(f"Error determining DST for {date_obj}: {e}")
-        return pytz.timezone('Etc/GMT-2')
+        return _BROKER_WINTER_TZ
+
+def convert_broker_times(times, timezone):
+    """
+    Convert naive broker server timestamps to a target timezone in one pass.
+    
+    Vectorized counterpart of get_broker_timezone_for_date: the summer/winter
+    offset is decided from Europe/Paris DST for the whole column at once,
+    treating ambiguous and nonexistent Paris times as summer time, as the
+    per-timestamp lookup does.
+
+    Args:
+        times (Series): Naive broker server timestamps
+        timezone (tzinfo): The timezone to convert to
+
+    Returns:
+        Series: The timezone-aware timestamps
+    """
+    paris_times = times.dt.tz_localize(
+        'Europe/Paris',
+        ambiguous=np.ones(len(times), dtype=bool),
+        nonexistent='shift_forward'
+    )
+    
+    # Paris is UTC+2 in summer, so the broker is UTC+3; otherwise UTC+2
+    paris_offsets = paris_times.dt.tz_localize(None) - paris_times.dt.tz_convert('UTC').dt.tz_localize(None)
+    broker_offsets = pd.to_timedelta(np.where(paris_offsets == pd.Timedelta(hours=2), 3, 2), unit='h')
+    
+    return (times - broker_offsets).dt.tz_localize('UTC').dt.tz_convert(timezone)
 
 def check_mt5_installed():
     """
@@ -156,8 +188,7 @@ def fetch_historical_data(symbol, timeframe_str, from_date, to_date=None):
             return None
         
         # Set timezone
-        config = get_config()
-        timezone = pytz.timezone(config['mt5']['timezone'])
+        timezone = get_mt5_timezone()
         
         # Apply timezone to dates
         from_date = from_date.replace(tzinfo=timezone)
@@ -182,16 +213,7 @@ def fetch_historical_data(symbol, timeframe_str, from_date, to_date=None):
         # Convert time column from Unix timestamp to datetime
         # MT5 timestamps are in broker server time (GMT+2 winter / GMT+3 summer)
         # NOT in UTC - we must localize to broker TZ first, then convert to target TZ
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-
-        converted_times = []
-        for ts in df['time']:
-            broker_tz = get_broker_timezone_for_date(ts)
-            localized = ts.tz_localize(broker_tz)
-            converted = localized.tz_convert(timezone)
-            converted_times.append(converted)
-
-        df['time'] = pd.Series(converted_times)
+        df['time'] = convert_broker_times(pd.to_datetime(df['time'], unit='s'), timezone)
         
         logger.info(f"Retrieved {len(df)} bars for {symbol} on {timeframe_str}")
         
@@ -231,7 +253,7 @@ def fetch_and_store_data_for_symbol(symbol, db_path, timeframes=None, days_histo
             timeframes = config['mt5']['timeframes']
         
         # Set timezone
-        timezone = pytz.timezone(config['mt5']['timezone'])
+        timezone = get_mt5_timezone()
         current_time = datetime.now(timezone)
         
         # Fetch and store data for each timeframe
@@ -259,16 +281,7 @@ def fetch_and_store_data_for_symbol(symbol, db_path, timeframes=None, days_histo
                     if rates is not None and len(rates) > 0:
                         df = pd.DataFrame(rates)
                         # Convert timestamps: MT5 timestamps are in broker server time
-                        df['time'] = pd.to_datetime(df['time'], unit='s')
-
-                        converted_times = []
-                        for ts in df['time']:
-                            broker_tz = get_broker_timezone_for_date(ts)
-                            localized = ts.tz_localize(broker_tz)
-                            converted = localized.tz_convert(timezone)
-                            converted_times.append(converted)
-
-                        df['time'] = pd.Series(converted_times)
+                        df['time'] = convert_broker_times(pd.to_datetime(df['time'], unit='s'), timezone)
                         # Store in database
                         insert_candle_data(db_path, df, timeframe, symbol)
                         logger.info(f"Inserted {len(df)} {timeframe} candles for {symbol} for month starting {start_date.strftime('%Y-%m-%d')}")
@@ -4,32 +4,45 @@ Backtest Panel Module
 This module provides the UI for backtesting trading strategies.
 """
 
+import atexit
+import copy
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.filedialog import asksaveasfilename
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime
-from tkcalendar import DateEntry
-import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
 import os
+import re
+import csv
+import gzip
+import sqlite3
+from functools import lru_cache, partial
+from logging.handlers import QueueHandler, QueueListener
+from operator import itemgetter
 
-from src.utils.config import get_config
+from src.utils.config import get_config, get_pip_settings
 from src.utils.time_utils import (
     format_datetime_for_db,
     combine_date_and_time,
     get_session_for_time
 )
 from src.data.database import (
+    close_connection,
+    configure_connection,
+    ensure_indexes,
+    get_connection,
     get_news_around_time,
-    get_trading_statistics
+    get_recent_entries,
+    get_trading_statistics,
+    get_win_rate_breakdowns
 )
 from src.analysis.backtest import (
     backtest_trade,
     batch_backtest,
-    summarize_backtest_results,
     calculate_drawdown,
     generate_equity_curve,
     check_news_for_entry
@@ -37,9 +50,237 @@ from src.analysis.backtest import (
 
 logger = logging.getLogger(__name__)
 
+# Fixed combobox choices, built once at import
+_HOUR_CHOICES = tuple(f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 15, 30, 45))
+_H4_CHOICES = (
+    "Downtrend overall trend", 
+    "Downtrend because of break of structure", 
+    "Uptrend overall trend", 
+    "Uptrend because of break of structure"
+)
+_H1_CHOICES = ("Downtrend", "Uptrend", "Consolidate")
+_ENTRY_POINT_CHOICES = ("Liquidity sweep", "Equilibrum", "FVG", "Order Block", "Breaker Block")
+_M15_CHOICES = ("Break structure to downtrend", "Break structure to Uptrend")
+# Result fields shown in the backtest results table; backtest_trade always sets them
+_RESULT_KEYS = ('StoplossSize', 'TradeRatio', 'Result', 'duration_hours')
+_RESULT_ROW = itemgetter(*_RESULT_KEYS)
+
+# Similar news table: headings, the News table column under each, and widths
+_SIMILAR_COLUMNS = ("Time", "Impact", "Currency", "News", "Pips_Highest_Shadow", "Pips_Lowest_Shadow", "actual", "forecast", "previous")
+_SIMILAR_GETTER = itemgetter("time", "impact", "currency", "news", "Pips_Highest_Shadow", "Pips_Lowest_Shadow", "actual", "forecast", "previous")
+_SIMILAR_WIDTHS = {"Time": 150, "News": 200}
+
+_YEAR_CHOICES = tuple(str(year) for year in range(2020, 2026))
+_MONTH_CHOICES = tuple(str(month) for month in range(1, 13))
+
+_PROCESS_POOL = None
+_MANAGER = None
+_WORKER_LOG_LISTENER = None
+# Backtests submitted to the pool that have not finished yet
+_PENDING_BACKTESTS = set()
+
+def _init_backtest_worker(log_queue, level):
+    """
+    Route a backtest worker process's log records to the main process.
+    
+    Args:
+        log_queue (multiprocessing.Queue): Queue drained by the main process's listener
+        level (int): The root logging level of the main process
+    """
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(level)
+
+def _get_process_pool():
+    """
+    Return the process pool used for CPU-bound backtests, creating it on first use.
+    
+    Returns:
+        ProcessPoolExecutor: The shared process pool
+    """
+    global _PROCESS_POOL, _WORKER_LOG_LISTENER
+    if _PROCESS_POOL is None:
+        # Worker processes log through a queue into the main process's handlers
+        root_logger = logging.getLogger()
+        log_queue = multiprocessing.Queue()
+        _WORKER_LOG_LISTENER = QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+        _WORKER_LOG_LISTENER.start()
+        atexit.register(_WORKER_LOG_LISTENER.stop)
+        
+        # Each dialog runs one backtest, so a few workers are plenty; this also stays
+        # under the 61-worker limit ProcessPoolExecutor has on Windows
+        _PROCESS_POOL = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            initializer=_init_backtest_worker,
+            initargs=(log_queue, root_logger.level)
+        )
+    return _PROCESS_POOL
+
+def _submit_backtest(fn, *args, **kwargs):
+    """
+    Submit a backtest to the process pool and track it until it finishes.
+    
+    Args:
+        fn (callable): The function to run in a worker process
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+        
+    Returns:
+        Future: The submitted backtest
+    """
+    future = _get_process_pool().submit(fn, *args, **kwargs)
+    _PENDING_BACKTESTS.add(future)
+    future.add_done_callback(_PENDING_BACKTESTS.discard)
+    return future
+
+def _new_cancel_event():
+    """
+    Create an event that can be passed to backtests running in the process pool.
+    
+    Returns:
+        Event: A manager-backed event proxy, picklable into pool workers
+    """
+    global _MANAGER
+    if _MANAGER is None:
+        _MANAGER = multiprocessing.Manager()
+    return _MANAGER.Event()
+
+def shutdown_backtest_workers():
+    """Stop the backtest process pool and the manager process behind the cancel events."""
+    global _PROCESS_POOL, _MANAGER
+    if _PROCESS_POOL is not None:
+        # Cancel queued backtests one by one; shutdown(cancel_futures=True) needs Python 3.9
+        for future in list(_PENDING_BACKTESTS):
+            future.cancel()
+        _PROCESS_POOL.shutdown(wait=False)
+        _PROCESS_POOL = None
+    if _MANAGER is not None:
+        _MANAGER.shutdown()
+        _MANAGER = None
+
+_GEOMETRY_RE = re.compile(r'^(\d+)x(\d+)\+(-?\d+)\+(-?\d+)$')
+
+def _offset_geometry(parent, offset=50):
+    """
+    Build a '+x+y' geometry string placing a dialog at an offset from its parent window.
+    
+    The parent's window geometry is read directly; an idle flush is only forced
+    when the window has not been mapped yet and still reports '1x1+0+0'.
+    
+    Args:
+        parent (tk.Widget): The widget the dialog belongs to
+        offset (int): Offset in pixels from the parent's top-left corner
+        
+    Returns:
+        str: The geometry string
+    """
+    window = parent.winfo_toplevel()
+    geometry = window.winfo_geometry()
+    
+    if geometry == '1x1+0+0':
+        window.update_idletasks()
+        geometry = window.winfo_geometry()
+    
+    match = _GEOMETRY_RE.match(geometry)
+    if not match:
+        return f"+{offset}+{offset}"
+    
+    x, y = int(match.group(3)), int(match.group(4))
+    return f"+{x + offset}+{y + offset}"
+
+def _insert_rows(tree, rows, iids=None, tags=None):
+    """
+    Append rows to a Treeview with a single Tcl call instead of one insert per row.
+    
+    Args:
+        tree (ttk.Treeview): The treeview to populate
+        rows (list): Sequence of value tuples, one per row
+        iids (list, optional): Item identifiers to assign, one per row
+        tags (list, optional): Tag tuples to apply, one per row
+    """
+    if not rows:
+        return
+    
+    # Build one Tcl loop over the row values and any per-row ids and tags
+    params, loop, options, args = ['rows'], 'r $rows', '-values $r', [rows]
+    if iids is not None:
+        params.append('iids')
+        loop += ' i $iids'
+        options += ' -id $i'
+        args.append(iids)
+    if tags is not None:
+        params.append('tags')
+        loop += ' t $tags'
+        options += ' -tags $t'
+        args.append(tags)
+    
+    tree.tk.call('apply', (' '.join(params), f'foreach {loop} {{ {tree} insert {{}} end {options} }}'), *args)
+
+class _UncachedResult(Exception):
+    """Carries an error result out of a memoized query so lru_cache does not store it."""
+    
+    def __init__(self, result):
+        super().__init__(result.get('error'))
+        self.result = result
+
+@lru_cache(maxsize=32)
+def _cached_trading_statistics(fingerprint, filter_items):
+    """
+    Memoized get_trading_statistics keyed by dataset fingerprint and filters.
+    
+    Args:
+        fingerprint (tuple): Dataset fingerprint, starting with the database path
+        filter_items (tuple): Sorted (column, value) filter pairs
+        
+    Returns:
+        dict: The trading statistics
+    """
+    stats = get_trading_statistics(fingerprint[0], dict(filter_items))
+    if 'error' in stats:
+        raise _UncachedResult(stats)
+    return stats
+
+@lru_cache(maxsize=32)
+def _cached_win_rate_breakdowns(fingerprint, filter_items):
+    """
+    Memoized get_win_rate_breakdowns keyed by dataset fingerprint and filters.
+    
+    Args:
+        fingerprint (tuple): Dataset fingerprint, starting with the database path
+        filter_items (tuple): Sorted (column, value) filter pairs
+        
+    Returns:
+        dict: The win rate breakdowns per facet
+    """
+    breakdowns = get_win_rate_breakdowns(fingerprint[0], dict(filter_items))
+    if 'error' in breakdowns:
+        raise _UncachedResult(breakdowns)
+    return breakdowns
+
+def _uncached_on_error(cached_query, fingerprint, filter_items):
+    """
+    Call a memoized query, returning its error result without caching it.
+    
+    Args:
+        cached_query (callable): _cached_trading_statistics or _cached_win_rate_breakdowns
+        fingerprint (tuple): The dataset fingerprint
+        filter_items (tuple): Sorted (column, value) filter pairs
+        
+    Returns:
+        dict: The query result
+    """
+    try:
+        return cached_query(fingerprint, filter_items)
+    except _UncachedResult as e:
+        return e.result
+
 class NewsDisplayDialog(tk.Toplevel):
     """Dialog for displaying news events."""
     
+    INSERT_CHUNK_SIZE = 200
+    
     def __init__(self, parent, news_data, date_limit, db_path):
         """Initialize the news display dialog."""
         super().__init__(parent)
@@ -48,11 +289,8 @@ class NewsDisplayDialog(tk.Toplevel):
         self.transient(parent)
         self.db_path = db_path
         
-        # Center on parent
-        parent.update_idletasks()
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        self.geometry(f"+{parent_x + 50}+{parent_y + 50}")
+        # Place relative to parent
+        self.geometry(_offset_geometry(parent))
         
         # Create treeview
         self.tree = ttk.Treeview(self, columns=("Time", "Impact", "Currency", "News"), show="headings")
@@ -67,9 +305,10 @@ class NewsDisplayDialog(tk.Toplevel):
         self.tree.column("Currency", width=100)
         self.tree.column("News", width=250)
         
-        # Insert data
-        for news in news_data:
-            self.tree.insert('', tk.END, values=(news['time'], news['impact'], news['currency'], news['news']))
+        # Insert data in chunks between event loop iterations so the dialog stays responsive
+        self._insert_after_id = None
+        self._pending_rows = [(news['time'], news['impact'], news['currency'], news['news']) for news in news_data]
+        self._insert_chunk()
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
@@ -84,6 +323,24 @@ class NewsDisplayDialog(tk.Toplevel):
         close_button = ttk.Button(self, text="Close", command=self.destroy)
         close_button.pack(side=tk.BOTTOM, pady=10)
     
+    def _insert_chunk(self):
+        """Insert the next chunk of pending rows and schedule the rest for when Tk is idle."""
+        chunk = self._pending_rows[:self.INSERT_CHUNK_SIZE]
+        del self._pending_rows[:self.INSERT_CHUNK_SIZE]
+        _insert_rows(self.tree, chunk)
+        
+        if self._pending_rows:
+            self._insert_after_id = self.after_idle(self._insert_chunk)
+        else:
+            self._insert_after_id = None
+    
+    def destroy(self):
+        """Stop inserting rows when the dialog is closed mid-load."""
+        if self._insert_after_id:
+            self.after_cancel(self._insert_after_id)
+            self._insert_after_id = None
+        super().destroy()
+    
     def on_item_double_click(self, event):
         """Handle double-click on a news item."""
         # Get the selected item
@@ -99,7 +356,7 @@ class NewsDisplayDialog(tk.Toplevel):
         time_str = values[0]
         
         # Convert time to datetime
-        news_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
+        news_time = datetime.fromisoformat(time_str)
         
         # Open similar news dialog
         from src.data.database import get_similar_news
@@ -120,31 +377,19 @@ class SimilarNewsDialog(tk.Toplevel):
         self.geometry("800x500")
         self.transient(parent)
         
-        # Center on parent
-        parent.update_idletasks()
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        self.geometry(f"+{parent_x + 50}+{parent_y + 50}")
+        # Place relative to parent
+        self.geometry(_offset_geometry(parent))
         
         # Create treeview
-        columns = ("Time", "Impact", "Currency", "News", "Pips_Highest_Shadow", "Pips_Lowest_Shadow", "actual", "forecast", "previous")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        self.tree = ttk.Treeview(self, columns=_SIMILAR_COLUMNS, show="headings")
         
-        # Set headings
-        for col in columns:
+        # Set headings and widths
+        for col in _SIMILAR_COLUMNS:
             self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
+            self.tree.column(col, width=_SIMILAR_WIDTHS.get(col, 100))
         
-        # Adjust column widths
-        self.tree.column("News", width=200)
-        self.tree.column("Time", width=150)
-        
-        # Insert data
-        for news in news_data:
-            values = []
-            for col in columns:
-                values.append(news.get(col, ""))
-            self.tree.insert('', tk.END, values=values)
+        # Project each News row onto the displayed columns and insert them in a single Tcl call
+        _insert_rows(self.tree, list(map(_SIMILAR_GETTER, news_data)))
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
@@ -173,15 +418,14 @@ class BacktestEntryDialog(tk.Toplevel):
         self.symbol = symbol
         self.db_path = db_path
         self.config = get_config()
+        self._cancel_event = None
+        self._future = None
         
         # Set accent color
         self.configure(bg=self.config['gui']['accent_color'])
         
-        # Center on parent
-        parent.update_idletasks()
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        self.geometry(f"+{parent_x + 50}+{parent_y + 50}")
+        # Place relative to parent
+        self.geometry(_offset_geometry(parent))
         
         # Create main frame
         self.main_frame = ttk.Frame(self)
@@ -214,10 +458,8 @@ class BacktestEntryDialog(tk.Toplevel):
         ttk.Label(self.main_frame, text="Open Time:").grid(column=0, row=current_row, sticky='w')
         self.hour_var = tk.StringVar()
         
-        # Generate hours from 00:00 to 23:45 in 15-minute intervals
-        hours = [f"{h:02d}:{m:02d}" for h in range(24) for m in [0, 15, 30, 45]]
-        
-        self.hour_entry = ttk.Combobox(self.main_frame, textvariable=self.hour_var, values=hours, width=5)
+        # Hours from 00:00 to 23:45 in 15-minute intervals
+        self.hour_entry = ttk.Combobox(self.main_frame, textvariable=self.hour_var, values=_HOUR_CHOICES, width=5)
         self.hour_entry.grid(column=1, row=current_row, sticky='ew')
         
         # Check news button
@@ -241,14 +483,7 @@ class BacktestEntryDialog(tk.Toplevel):
         ttk.Label(self.main_frame, text="H4:").grid(column=0, row=current_row, sticky='w')
         self.h4_var = tk.StringVar()
         
-        h4_options = [
-            "Downtrend overall trend", 
-            "Downtrend because of break of structure", 
-            "Uptrend overall trend", 
-            "Uptrend because of break of structure"
-        ]
-        
-        self.h4_dropdown = ttk.Combobox(self.main_frame, textvariable=self.h4_var, values=h4_options, width=40)
+        self.h4_dropdown = ttk.Combobox(self.main_frame, textvariable=self.h4_var, values=_H4_CHOICES, width=40)
         self.h4_dropdown.grid(column=1, row=current_row, columnspan=2, sticky='ew')
         current_row += 1
         
@@ -256,9 +491,7 @@ class BacktestEntryDialog(tk.Toplevel):
         ttk.Label(self.main_frame, text="H1:").grid(column=0, row=current_row, sticky='w')
         self.h1_var = tk.StringVar()
         
-        h1_options = ["Downtrend", "Uptrend", "Consolidate"]
-        
-        self.h1_dropdown = ttk.Combobox(self.main_frame, textvariable=self.h1_var, values=h1_options, width=20)
+        self.h1_dropdown = ttk.Combobox(self.main_frame, textvariable=self.h1_var, values=_H1_CHOICES, width=20)
         self.h1_dropdown.grid(column=1, row=current_row, columnspan=2, sticky='ew')
         current_row += 1
         
@@ -266,9 +499,7 @@ class BacktestEntryDialog(tk.Toplevel):
         ttk.Label(self.main_frame, text="Confluence:").grid(column=0, row=current_row, sticky='w')
         self.entry_point_var = tk.StringVar()
         
-        entry_point_options = ["Liquidity sweep", "Equilibrum", "FVG", "Order Block", "Breaker Block"]
-        
-        self.entry_point_dropdown = ttk.Combobox(self.main_frame, textvariable=self.entry_point_var, values=entry_point_options, width=20)
+        self.entry_point_dropdown = ttk.Combobox(self.main_frame, textvariable=self.entry_point_var, values=_ENTRY_POINT_CHOICES, width=20)
         self.entry_point_dropdown.grid(column=1, row=current_row, columnspan=2, sticky='ew')
         current_row += 1
         
@@ -276,9 +507,7 @@ class BacktestEntryDialog(tk.Toplevel):
         ttk.Label(self.main_frame, text="M15:").grid(column=0, row=current_row, sticky='w')
         self.m15_var = tk.StringVar()
         
-        m15_options = ["Break structure to downtrend", "Break structure to Uptrend"]
-        
-        self.m15_dropdown = ttk.Combobox(self.main_frame, textvariable=self.m15_var, values=m15_options, width=30)
+        self.m15_dropdown = ttk.Combobox(self.main_frame, textvariable=self.m15_var, values=_M15_CHOICES, width=30)
         self.m15_dropdown.grid(column=1, row=current_row, columnspan=2, sticky='ew')
         current_row += 1
         
@@ -313,6 +542,10 @@ class BacktestEntryDialog(tk.Toplevel):
         self.results_tree.column("Result", width=70)
         self.results_tree.column("Duration", width=70)
         
+        # Color rows by outcome using Treeview tags
+        self.results_tree.tag_configure('win', foreground='green')
+        self.results_tree.tag_configure('loss', foreground='red')
+        
         # Add scrollbar
         scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
         self.results_tree.configure(yscroll=scrollbar.set)
@@ -329,8 +562,12 @@ class BacktestEntryDialog(tk.Toplevel):
         button_frame.pack(fill=tk.X, padx=10, pady=10)
         
         # Backtest button
-        backtest_button = ttk.Button(button_frame, text="Run Backtest", command=self.run_backtest)
-        backtest_button.pack(side=tk.LEFT, padx=5)
+        self.backtest_button = ttk.Button(button_frame, text="Run Backtest", command=self.run_backtest)
+        self.backtest_button.pack(side=tk.LEFT, padx=5)
+        
+        # Stop button, enabled while a backtest is running
+        self.stop_button = ttk.Button(button_frame, text="Stop", command=self._stop_backtest, state=tk.DISABLED)
+        self.stop_button.pack(side=tk.LEFT, padx=5)
         
         # Add Entry button
         add_entry_button = ttk.Button(button_frame, text="Add to Database", command=self.add_entry)
@@ -342,6 +579,9 @@ class BacktestEntryDialog(tk.Toplevel):
     
     def _open_calendar(self):
         """Open calendar for day selection."""
+        # Imported on first use to keep panel startup light
+        from tkcalendar import Calendar
+        
         cal_win = tk.Toplevel(self)
         cal_win.title("Select Day")
         cal_win.transient(self)
@@ -350,11 +590,11 @@ class BacktestEntryDialog(tk.Toplevel):
         cal_year = int(self.year)
         cal_month = int(self.month)
         
-        cal = DateEntry(cal_win, selectmode='day', year=cal_year, month=cal_month, day=1)
+        cal = Calendar(cal_win, selectmode='day', year=cal_year, month=cal_month, day=1)
         cal.pack(padx=10, pady=10)
         
-        def _confirm_date():
-            selected_date = cal.get_date()
+        def _confirm_date(event=None):
+            selected_date = cal.selection_get()
             
             # Format as day/month/year
             formatted_date = selected_date.strftime('%d/%m/%y')
@@ -366,17 +606,11 @@ class BacktestEntryDialog(tk.Toplevel):
             # Close calendar window
             cal_win.destroy()
         
-        ttk.Button(cal_win, text="Ok", command=_confirm_date).pack()
-        
-        # Center on parent
-        self.update_idletasks()
-        dialog_x = self.winfo_x()
-        dialog_y = self.winfo_y()
-        
-        cal_win.update_idletasks()
-        cal_win.geometry(f"+{dialog_x + 50}+{dialog_y + 50}")
+        # Selecting a day confirms it immediately
+        cal.bind("<<CalendarSelected>>", _confirm_date)
         
-        cal_win.wait_window()
+        # Place relative to this dialog
+        cal_win.geometry(_offset_geometry(self))
     
     def _check_news(self):
         """Check for news events around the selected time."""
@@ -397,7 +631,26 @@ class BacktestEntryDialog(tk.Toplevel):
         hours_before = self.config['news']['hours_before']
         hours_after = self.config['news']['hours_after']
         
-        news_events = check_news_for_entry(self.db_path, start_datetime, hours_before, hours_after)
+        # Query on the application's background worker while the button shows progress
+        self.check_news_btn.config(text="Checking...", state=tk.DISABLED)
+        self.parent.main_app.run_in_thread(
+            self._check_news_worker,
+            args=(start_datetime, hours_before, hours_after)
+        )
+    
+    def _check_news_worker(self, start_datetime, hours_before, hours_after):
+        """Fetch news events around the entry time in a background thread."""
+        try:
+            news_events = check_news_for_entry(self.db_path, start_datetime, hours_before, hours_after)
+        except Exception as e:
+            logger.error(f"Error checking news: {e}")
+            news_events = []
+        
+        self.parent.main_app.post_to_ui(self._show_news_dialog, news_events, start_datetime)
+    
+    def _show_news_dialog(self, news_events, start_datetime):
+        """Restore the news button and show the events found, if any."""
+        self.check_news_btn.config(text="Check News", state=tk.NORMAL)
         
         if news_events:
             # Open news display dialog
@@ -417,44 +670,84 @@ class BacktestEntryDialog(tk.Toplevel):
         
         # Start backtest
         self.backtest_results = []
+        self._results_df = None
+        
+        # Run backtest in a worker process and handle the result on the main thread
+        self._cancel_event = _new_cancel_event()
+        self.backtest_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
         
-        # Run backtest in a separate thread
-        threading.Thread(target=self._run_backtest_thread, args=(entry_data,)).start()
+        # Hand the worker the settings as they are now; the saved file may lag behind
+        self._future = _submit_backtest(
+            backtest_trade, self.db_path, self.symbol, entry_data, self._cancel_event,
+            config=copy.deepcopy(self.config), pip_settings=get_pip_settings(self.symbol)
+        )
+        self._future.add_done_callback(partial(self.parent.main_app.post_to_ui, self._on_backtest_done))
     
-    def _run_backtest_thread(self, entry_data):
-        """Run backtest in a separate thread."""
+    def _stop_backtest(self):
+        """Ask the running backtest to stop before its next scenario."""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.stop_button.config(state=tk.DISABLED)
+    
+    def destroy(self):
+        """Stop any running backtest when the dialog is closed."""
+        # A backtest still waiting for a worker never starts; a running one stops at its next scenario
+        if self._future is not None:
+            self._future.cancel()
+        self._stop_backtest()
+        super().destroy()
+    
+    def _on_backtest_done(self, future):
+        """Store the finished backtest results and display them."""
+        # The dialog may have been closed while the backtest was running
+        if not self.winfo_exists():
+            return
+        
+        self._cancel_event = None
+        self._future = None
+        self.backtest_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        
         try:
-            # Run backtest
-            results = backtest_trade(self.db_path, self.symbol, entry_data)
-            
-            # Save results
-            self.backtest_results = results
-            
-            # Update UI on main thread
-            self.after(0, self._update_results_display)
+            self.backtest_results = future.result()
+        except CancelledError:
+            self.backtest_results = []
+            children = self.results_tree.get_children()
+            if children:
+                self.results_tree.delete(*children)
+            messagebox.showinfo("Backtest", "Backtest cancelled")
+            return
         except Exception as e:
             logger.error(f"Error in backtest: {e}")
-            self.after(0, lambda: messagebox.showerror("Error", f"Backtest failed: {e}"))
+            messagebox.showerror("Error", f"Backtest failed: {e}")
+            return
+        
+        self._update_results_display()
     
     def _update_results_display(self):
         """Update the results display."""
-        # Clear existing results
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        # Clear existing results in a single Tcl call
+        children = self.results_tree.get_children()
+        if children:
+            self.results_tree.delete(*children)
         
-        # Add new results
+        # Add new results in a single Tcl call, colored by outcome
         if self.backtest_results:
-            for result in self.backtest_results:
-                self.results_tree.insert('', tk.END, values=(
-                    result.get('StoplossSize'),
-                    result.get('TradeRatio'),
-                    result.get('Result'),
-                    result.get('duration_hours')
-                ))
+            outcome_tags = {'Winning': ('win',), 'Losing': ('loss',)}
+            try:
+                rows = list(map(_RESULT_ROW, self.backtest_results))
+            except KeyError:
+                rows = [tuple(result.get(key) for key in _RESULT_KEYS) for result in self.backtest_results]
+            _insert_rows(self.results_tree, rows, tags=[outcome_tags.get(row[2], ()) for row in rows])
             
-            # Show summary
-            summary = summarize_backtest_results(self.backtest_results)
-            win_rate = summary['win_rate']
+            # Build the results frame once and derive the summary from it
+            self._results_df = pd.DataFrame(self.backtest_results)
+            decided = self._results_df['Result'].isin(('Winning', 'Losing'))
+            if decided.any():
+                win_rate = (self._results_df.loc[decided, 'Result'] == 'Winning').mean() * 100
+            else:
+                win_rate = 0
             messagebox.showinfo("Backtest Complete", f"Backtest completed with {len(self.backtest_results)} scenarios.\n"
                                 f"Win rate: {win_rate:.1f}%")
         else:
@@ -473,23 +766,28 @@ class BacktestEntryDialog(tk.Toplevel):
         # All backtest results are already in the database (saved during backtest)
         messagebox.showinfo("Success", "Backtest results added to database")
         
+        # Show the new entries in the panel
+        if hasattr(self.parent, 'load_recent_entries'):
+            self.parent.load_recent_entries()
+            self.parent.update_analysis()
+        
         # Close dialog
         self.destroy()
     
     def _validate_inputs(self):
         """Validate user inputs."""
         # Check required fields
-        required_fields = {
-            "Day": self.day_var.get(),
-            "Open Time": self.hour_var.get(),
-            "Position": self.position_var.get(),
-            "H4": self.h4_var.get(),
-            "H1": self.h1_var.get(),
-            "M15": self.m15_var.get(),
-            "Entry Point": self.entry_point_var.get()
-        }
+        required_fields = (
+            ("Day", self.day_var),
+            ("Open Time", self.hour_var),
+            ("Position", self.position_var),
+            ("H4", self.h4_var),
+            ("H1", self.h1_var),
+            ("M15", self.m15_var),
+            ("Entry Point", self.entry_point_var)
+        )
         
-        missing_fields = [field for field, value in required_fields.items() if not value]
+        missing_fields = [field for field, var in required_fields if not var.get()]
         
         if missing_fields:
             messagebox.showerror("Error", f"Missing required fields: {', '.join(missing_fields)}")
@@ -515,6 +813,29 @@ class BacktestEntryDialog(tk.Toplevel):
 class BacktestPanel(ttk.Frame):
     """Panel for backtesting."""
     
+    # Fixed queries, kept as constants so the connection's statement cache reuses them
+    _SQL_ENTRY_BY_ID = "SELECT * FROM trading_entries WHERE id = ?"
+    # Columns consumed by generate_equity_curve / calculate_drawdown
+    EQUITY_COLS = ("StartDatetime", "EndDatetime", "Result", "TradeRatio", "StoplossSize", "position")
+    _SQL_CLOSED_TRADES = f"""
+        SELECT {', '.join(EQUITY_COLS)} FROM trading_entries 
+        WHERE Result IN ('Winning', 'Losing')
+        ORDER BY StartDatetime
+    """
+    _SQL_EXPORT = "SELECT * FROM trading_entries"
+    _SQL_FINGERPRINT = "SELECT MAX(id), COUNT(*) FROM trading_entries"
+    
+    GRAPH_EXPORT_DPI = 150
+    RECENT_ENTRIES_LIMIT = 50
+    
+    # (breakdown facet, subplot title, y label) for the win rate grid
+    WIN_RATE_FACETS = (
+        ('stoploss', 'Win Rate by Stop Loss', 'Win Rate (%)'),
+        ('ratio', 'Win Rate by Ratio', None),
+        ('session', 'Win Rate by Session', 'Win Rate (%)'),
+        ('position', 'Win Rate by Position', None)
+    )
+    
     def __init__(self, parent, main_app):
         """Initialize the backtest panel."""
         super().__init__(parent)
@@ -526,6 +847,23 @@ class BacktestPanel(ttk.Frame):
         self.current_db_path = None
         self.current_symbol = None
         self.backtest_results = []
+        self._pending_filter_id = None
+        self._conn = None
+        self._conn_path = None
+        self._cached_curves = None
+        self._latest_stats = None
+        self._latest_breakdowns = None
+        self._latest_curves = (None, None)
+        self._last_loaded_id = None
+        # A single analysis worker, so the curve cache is only ever touched by one thread
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._analysis_request = 0
+        self._analysis_future = None
+        self._equity_ax = None
+        self._win_rate_axes = None
+        self._win_rate_bars = {}
+        self._drawdown_ax = None
+        self._dirty = {'equity': True, 'win_rate': True, 'drawdown': True}
         
         # Create UI
         self.create_ui()
@@ -546,6 +884,9 @@ class BacktestPanel(ttk.Frame):
         # Set up each tab
         self._setup_new_backtest_tab()
         self._setup_analysis_tab()
+        
+        # Graph figures are created the first time the Analysis tab is shown
+        self.notebook.bind("<<NotebookTabChanged>>", self._maybe_init_graphs)
     
     def _setup_new_backtest_tab(self):
         """Set up the new backtest tab."""
@@ -561,16 +902,14 @@ class BacktestPanel(ttk.Frame):
         ttk.Label(main_frame, text="Year:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         
         self.year_var = tk.StringVar()
-        years = [str(year) for year in range(2020, 2026)]
-        year_combo = ttk.Combobox(main_frame, textvariable=self.year_var, values=years, width=6)
+        year_combo = ttk.Combobox(main_frame, textvariable=self.year_var, values=_YEAR_CHOICES, width=6)
         year_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
         year_combo.set(str(datetime.now().year))
         
         ttk.Label(main_frame, text="Month:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
         
         self.month_var = tk.StringVar()
-        months = [str(month) for month in range(1, 13)]
-        month_combo = ttk.Combobox(main_frame, textvariable=self.month_var, values=months, width=6)
+        month_combo = ttk.Combobox(main_frame, textvariable=self.month_var, values=_MONTH_CHOICES, width=6)
         month_combo.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
         month_combo.set(str(datetime.now().month))
         
@@ -644,18 +983,21 @@ class BacktestPanel(ttk.Frame):
         self.filter_position_var = tk.StringVar(value="All")
         position_combo = ttk.Combobox(filter_frame, textvariable=self.filter_position_var, values=["All", "Buy", "Sell"], width=10)
         position_combo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+        position_combo.bind("<<ComboboxSelected>>", self._schedule_apply)
         
         ttk.Label(filter_frame, text="H4:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         
         self.filter_h4_var = tk.StringVar(value="All")
         h4_combo = ttk.Combobox(filter_frame, textvariable=self.filter_h4_var, values=["All", "Uptrend", "Downtrend"], width=10)
         h4_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        h4_combo.bind("<<ComboboxSelected>>", self._schedule_apply)
 
         ttk.Label(filter_frame, text="Result:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
         
         self.filter_result_var = tk.StringVar(value="All")
         result_combo = ttk.Combobox(filter_frame, textvariable=self.filter_result_var, values=["All", "Winning", "Losing"], width=10)
         result_combo.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        result_combo.bind("<<ComboboxSelected>>", self._schedule_apply)
         
         apply_button = ttk.Button(filter_frame, text="Apply Filters", command=self.apply_filters)
         apply_button.grid(row=3, column=0, columnspan=2, sticky=tk.EW, padx=5, pady=10)
@@ -686,30 +1028,25 @@ class BacktestPanel(ttk.Frame):
         main_frame.grid_columnconfigure(2, weight=1)
         
         # Create tabs for different graphs
-        graphs_notebook = ttk.Notebook(graphs_frame)
-        graphs_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.graphs_notebook = ttk.Notebook(graphs_frame)
+        self.graphs_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Only the visible graph is redrawn; hidden ones are drawn when selected
+        self.graphs_notebook.bind("<<NotebookTabChanged>>", self._refresh_visible_graph)
         
         # Create tab frames
-        equity_tab = ttk.Frame(graphs_notebook)
-        win_rate_tab = ttk.Frame(graphs_notebook)
-        drawdown_tab = ttk.Frame(graphs_notebook)
+        self.equity_tab = ttk.Frame(self.graphs_notebook)
+        self.win_rate_tab = ttk.Frame(self.graphs_notebook)
+        self.drawdown_tab = ttk.Frame(self.graphs_notebook)
         
-        graphs_notebook.add(equity_tab, text="Equity Curve")
-        graphs_notebook.add(win_rate_tab, text="Win Rate Analysis")
-        graphs_notebook.add(drawdown_tab, text="Drawdown Analysis")
+        self.graphs_notebook.add(self.equity_tab, text="Equity Curve")
+        self.graphs_notebook.add(self.win_rate_tab, text="Win Rate Analysis")
+        self.graphs_notebook.add(self.drawdown_tab, text="Drawdown Analysis")
         
-        # Create figures for each tab
-        self.equity_fig = plt.Figure(figsize=(5, 4), dpi=100)
-        self.equity_canvas = FigureCanvasTkAgg(self.equity_fig, equity_tab)
-        self.equity_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        self.win_rate_fig = plt.Figure(figsize=(5, 4), dpi=100)
-        self.win_rate_canvas = FigureCanvasTkAgg(self.win_rate_fig, win_rate_tab)
-        self.win_rate_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        self.drawdown_fig = plt.Figure(figsize=(5, 4), dpi=100)
-        self.drawdown_canvas = FigureCanvasTkAgg(self.drawdown_fig, drawdown_tab)
-        self.drawdown_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Figures are created lazily by _maybe_init_graphs
+        self.equity_fig = None
+        self.win_rate_fig = None
+        self.drawdown_fig = None
         
         # Export buttons
         export_frame = ttk.Frame(main_frame)
@@ -720,11 +1057,88 @@ class BacktestPanel(ttk.Frame):
         
         export_graph_button = ttk.Button(export_frame, text="Export Graphs", command=self.export_graphs)
         export_graph_button.pack(side=tk.LEFT, padx=5)
+        
+        self.graph_format_var = tk.StringVar(value="png")
+        graph_format_combo = ttk.Combobox(export_frame, textvariable=self.graph_format_var, width=5)
+        graph_format_combo['values'] = ("png", "pdf", "svg")
+        graph_format_combo.state(['readonly'])
+        graph_format_combo.pack(side=tk.LEFT, padx=5)
+    
+    def _maybe_init_graphs(self, event=None):
+        """Create the analysis figures the first time the Analysis tab is shown."""
+        if self.notebook.select() != str(self.analysis_tab):
+            return
+        
+        self.notebook.unbind("<<NotebookTabChanged>>")
+        
+        # matplotlib is only loaded once the graphs are needed
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        # Create figures for each tab
+        self.equity_fig = Figure(figsize=(5, 4), dpi=100)
+        self.equity_canvas = FigureCanvasTkAgg(self.equity_fig, self.equity_tab)
+        self.equity_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        self.win_rate_fig = Figure(figsize=(5, 4), dpi=100)
+        self.win_rate_canvas = FigureCanvasTkAgg(self.win_rate_fig, self.win_rate_tab)
+        self.win_rate_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        self.drawdown_fig = Figure(figsize=(5, 4), dpi=100)
+        self.drawdown_canvas = FigureCanvasTkAgg(self.drawdown_fig, self.drawdown_tab)
+        self.drawdown_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Draw the graphs for an already opened database
+        if self.current_db_path:
+            self.update_analysis()
+    
+    def _get_connection(self):
+        """
+        Return the panel's long-lived connection to the current database.
+        
+        Only the Tk main thread may use, open or close this connection; the
+        analysis worker uses its own thread-local connection instead.
+        """
+        if self._conn is None or self._conn_path != self.current_db_path:
+            self._close_connection()
+            self._conn = configure_connection(sqlite3.connect(self.current_db_path))
+            ensure_indexes(self._conn)
+            self._conn_path = self.current_db_path
+        return self._conn
+    
+    def _close_connection(self):
+        """Close the panel's database connection if one is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._conn_path = None
+    
+    def destroy(self):
+        """Stop background analysis and close the database connection when the panel is destroyed."""
+        # Drop the latest request if it has not started; shutdown(cancel_futures=True) needs Python 3.9
+        if self._analysis_future is not None:
+            self._analysis_future.cancel()
+        
+        # The worker's thread-local connection can only be closed from the worker itself
+        self._executor.submit(close_connection)
+        self._executor.shutdown(wait=False)
+        self._close_connection()
+        
+        # data_version is per connection, so keys from the worker's connection must not outlive it
+        _cached_trading_statistics.cache_clear()
+        _cached_win_rate_breakdowns.cache_clear()
+        super().destroy()
     
     def on_database_opened(self, db_path, symbol):
         """Handle when a database is opened."""
+        # The worker reopens its connection for the new database, which restarts data_version
+        if db_path != self.current_db_path:
+            _cached_trading_statistics.cache_clear()
+            _cached_win_rate_breakdowns.cache_clear()
+        
         self.current_db_path = db_path
         self.current_symbol = symbol
+        self._last_loaded_id = None
         
         # Update labels
         self.symbol_label.config(text=symbol)
@@ -737,34 +1151,40 @@ class BacktestPanel(ttk.Frame):
         self.update_analysis()
     
     def load_recent_entries(self):
-        """Load recent entries from the database."""
+        """
+        Load recent entries from the database.
+        
+        The first load fills the list; later loads only fetch entries added
+        since then, put them on top and drop the oldest rows beyond the limit.
+        """
         if not self.current_db_path:
             return
         
-        # Clear existing entries
-        for item in self.entries_tree.get_children():
-            self.entries_tree.delete(item)
-        
         try:
-            # Connect to the database
-            import sqlite3
-            conn = sqlite3.connect(self.current_db_path)
-            c = conn.cursor()
-            
-            # Get recent entries
-            c.execute("""
-                SELECT day, OpenTime, position, Result, TradeRatio, StoplossSize 
-                FROM trading_entries 
-                ORDER BY id DESC 
-                LIMIT 50
-            """)
+            rows = get_recent_entries(self.current_db_path, limit=self.RECENT_ENTRIES_LIMIT,
+                                      conn=self._get_connection(), since_id=self._last_loaded_id)
             
-            # Add to treeview
-            for row in c.fetchall():
-                self.entries_tree.insert('', tk.END, values=row)
+            if self._last_loaded_id is None:
+                # Clear existing entries in a single Tcl call
+                children = self.entries_tree.get_children()
+                if children:
+                    self.entries_tree.delete(*children)
+                
+                # Add them to the treeview in one batch, keyed by row id
+                _insert_rows(self.entries_tree, [row[1:] for row in rows], iids=[row[0] for row in rows])
+            else:
+                # Rows come newest first, so keep that order at the top of the list
+                for index, row in enumerate(rows):
+                    self.entries_tree.insert('', index, iid=row[0], values=row[1:])
+                
+                stale = self.entries_tree.get_children()[self.RECENT_ENTRIES_LIMIT:]
+                if stale:
+                    self.entries_tree.delete(*stale)
             
-            # Close connection
-            conn.close()
+            if rows:
+                self._last_loaded_id = rows[0][0]
+            elif self._last_loaded_id is None:
+                self._last_loaded_id = 0
         except Exception as e:
             logger.error(f"Error loading recent entries: {e}")
             messagebox.showerror("Error", f"Failed to load recent entries: {e}")
@@ -776,13 +1196,10 @@ class BacktestPanel(ttk.Frame):
         if not selection:
             return
         
-        item = self.entries_tree.item(selection[0])
-        values = item['values']
-        
-        # Show entry details
-        self.show_entry_details(values)
+        # Item identifiers are the trading_entries row ids
+        self.show_entry_details(int(selection[0]))
     
-    def show_entry_details(self, values):
+    def show_entry_details(self, entry_id):
         """Show entry details in a dialog."""
         # Create a new dialog
         dialog = tk.Toplevel(self)
@@ -792,32 +1209,27 @@ class BacktestPanel(ttk.Frame):
         
         # Get full entry data
         try:
-            import sqlite3
-            conn = sqlite3.connect(self.current_db_path)
-            conn.row_factory = sqlite3.Row
-            c = conn.cursor()
+            c = self._get_connection().cursor()
+            c.row_factory = sqlite3.Row
             
-            # Get entry by matching several fields
-            c.execute("""
-                SELECT * FROM trading_entries 
-                WHERE day = ? AND OpenTime = ? AND position = ? AND TradeRatio = ? AND StoplossSize = ?
-                LIMIT 1
-            """, values[0:3] + values[4:6])
+            # Get entry by primary key
+            c.execute(self._SQL_ENTRY_BY_ID, (entry_id,))
             
             entry = c.fetchone()
-            conn.close()
             
             if entry:
                 # Create a frame
                 frame = ttk.Frame(dialog, padding=10)
                 frame.pack(fill=tk.BOTH, expand=True)
                 
-                # Add fields
-                row = 0
-                for key in entry.keys():
-                    ttk.Label(frame, text=f"{key}:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
-                    ttk.Label(frame, text=str(entry[key])).grid(row=row, column=1, sticky=tk.W, padx=5, pady=2)
-                    row += 1
+                # Create the label pairs in one pass over the row, then lay them out
+                fields = [
+                    (ttk.Label(frame, text=f"{key}:"), ttk.Label(frame, text=str(value)))
+                    for key, value in zip(entry.keys(), tuple(entry))
+                ]
+                for row, (key_label, value_label) in enumerate(fields):
+                    key_label.grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
+                    value_label.grid(row=row, column=1, sticky=tk.W, padx=5, pady=2)
             else:
                 ttk.Label(dialog, text="Entry not found").pack(pady=20)
         except Exception as e:
@@ -839,8 +1251,17 @@ class BacktestPanel(ttk.Frame):
         """Open dialog for batch backtesting."""
         messagebox.showinfo("Batch Backtest", "Batch backtest feature is not implemented yet")
     
+    def _schedule_apply(self, event=None):
+        """Debounce filter changes so rapid selections trigger a single refresh."""
+        if self._pending_filter_id:
+            self.after_cancel(self._pending_filter_id)
+        self._pending_filter_id = self.after(200, self.apply_filters)
+    
     def apply_filters(self):
         """Apply filters to the analysis."""
+        if self._pending_filter_id:
+            self.after_cancel(self._pending_filter_id)
+            self._pending_filter_id = None
         self.update_analysis()
     
     def update_analysis(self):
@@ -859,168 +1280,250 @@ class BacktestPanel(ttk.Frame):
         if self.filter_result_var.get() != "All":
             filters['Result'] = self.filter_result_var.get()
         
-        # Get statistics
-        try:
-            stats = get_trading_statistics(self.current_db_path, filters)
-            
-            # Update statistics labels
-            self.total_trades_label.config(text=str(stats['total_entries']))
-            self.win_rate_label.config(text=f"{stats['win_rate']:.1f}%")
-            self.avg_duration_label.config(text="N/A hours")
+        # Compute in the background; only the newest request gets applied, so an older one
+        # still waiting for the worker is dropped
+        if self._analysis_future is not None:
+            self._analysis_future.cancel()
+        self._analysis_request += 1
+        request_id = self._analysis_request
+        self._analysis_future = self._executor.submit(self._compute_analysis, self.current_db_path, filters)
+        self._analysis_future.add_done_callback(partial(self.main_app.post_to_ui, self._apply_analysis, request_id))
+    
+    def _compute_analysis(self, db_path, filters):
+        """
+        Run the analysis queries and curve computations off the Tk main thread.
+        
+        Args:
+            db_path (str): The database to analyze, captured when the request was made
+            filters (dict): Column filters selected in the analysis tab
             
-            # Update graphs
-            self.update_equity_graph()
-            self.update_win_rate_graph(stats)
-            self.update_drawdown_graph()
+        Returns:
+            tuple: (stats, breakdowns, curves)
+        """
+        # The worker's own thread-local connection, never the panel's UI connection
+        conn = get_connection(db_path)
+        fingerprint = self._dataset_fingerprint(db_path, conn)
+        filter_items = tuple(sorted(filters.items()))
+        stats = _uncached_on_error(_cached_trading_statistics, fingerprint, filter_items)
+        breakdowns = _uncached_on_error(_cached_win_rate_breakdowns, fingerprint, filter_items)
+        curves = self._recompute_curves(fingerprint, conn)
+        return stats, breakdowns, curves
+    
+    def _apply_analysis(self, request_id, future):
+        """Show the results of a finished analysis request unless a newer one was issued."""
+        if request_id != self._analysis_request:
+            return
+        
+        try:
+            stats, breakdowns, curves = future.result()
         except Exception as e:
             logger.error(f"Error updating analysis: {e}")
             messagebox.showerror("Error", f"Failed to update analysis: {e}")
+            return
+        
+        # Update statistics labels
+        self.total_trades_label.config(text=str(stats['total_entries']))
+        self.win_rate_label.config(text=f"{stats['win_rate']:.1f}%")
+        self.avg_duration_label.config(text="N/A hours")
+        
+        # Mark every graph stale and redraw only the one on screen
+        self._latest_stats = stats
+        self._latest_breakdowns = breakdowns
+        self._latest_curves = curves
+        self._dirty = dict.fromkeys(self._dirty, True)
+        self._refresh_visible_graph()
+    
+    def _render_graph(self, name):
+        """Redraw one graph from the latest analysis data and clear its dirty flag."""
+        if name == 'equity':
+            self.update_equity_graph()
+        elif name == 'win_rate':
+            self.update_win_rate_graph(self._latest_breakdowns)
+        else:
+            self.update_drawdown_graph()
+        self._dirty[name] = False
+    
+    def _refresh_visible_graph(self, event=None):
+        """Redraw the selected graph tab if the analysis changed since it was drawn."""
+        if self.equity_fig is None or self._latest_stats is None:
+            return
+        
+        tabs = {
+            str(self.equity_tab): 'equity',
+            str(self.win_rate_tab): 'win_rate',
+            str(self.drawdown_tab): 'drawdown'
+        }
+        name = tabs.get(self.graphs_notebook.select())
+        if name and self._dirty[name]:
+            self._render_graph(name)
+    
+    def _dataset_fingerprint(self, db_path, conn):
+        """
+        Return a key that changes whenever trading entries are added, removed or updated.
+        
+        data_version moves when another connection commits and total_changes
+        when this one does, so in-place updates are caught as well as inserts.
+        """
+        max_id, count = conn.execute(self._SQL_FINGERPRINT).fetchone()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return (db_path, max_id, count, data_version, conn.total_changes)
+    
+    def _recompute_curves(self, key, conn):
+        """
+        Read the closed trades once and derive both the equity curve and drawdown data.
+        
+        Results are cached until the dataset fingerprint changes.
+        
+        Args:
+            key (tuple): The current dataset fingerprint
+            conn (sqlite3.Connection): The calling thread's connection to the database
+            
+        Returns:
+            tuple: (equity_curve, drawdown_data), or (None, None) if there are no closed trades
+        """
+        if self._cached_curves is not None and self._cached_curves[0] == key:
+            return self._cached_curves[1]
+        
+        # Get trading entries
+        df = pd.read_sql_query(self._SQL_CLOSED_TRADES, conn)
+        
+        if df.empty:
+            curves = (None, None)
+        else:
+            curves = (generate_equity_curve(df), calculate_drawdown(df))
+        
+        self._cached_curves = (key, curves)
+        return curves
     
     def update_equity_graph(self):
         """Update the equity curve graph."""
         try:
-            import sqlite3
-            conn = sqlite3.connect(self.current_db_path)
-            
-            # Get trading entries
-            query = """
-                SELECT * FROM trading_entries 
-                WHERE Result IN ('Winning', 'Losing')
-                ORDER BY StartDatetime
-            """
+            equity_curve, _ = self._latest_curves
             
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
-            if not df.empty:
-                # Generate equity curve
-                equity_curve = generate_equity_curve(df.to_dict('records'))
-                
-                # Plot equity curve
-                self.equity_fig.clear()
-                ax = self.equity_fig.add_subplot(111)
+            if equity_curve is not None:
+                # Build the axes and artists once, later updates only swap their data
+                if self._equity_ax is None:
+                    self.equity_fig.clear()
+                    ax = self.equity_fig.add_subplot(111)
+                    
+                    self._equity_line, = ax.plot([], [], linestyle='-')
+                    
+                    # Trade markers, one scatter per outcome
+                    self._equity_scatter_win = ax.scatter([], [], color='green', zorder=3)
+                    self._equity_scatter_lose = ax.scatter([], [], color='red', zorder=3)
+                    
+                    ax.set_title('Equity Curve')
+                    ax.set_xlabel('Trade Number')
+                    ax.set_ylabel('Balance')
+                    ax.grid(True)
+                    
+                    self.equity_fig.tight_layout()
+                    self._equity_ax = ax
                 
-                ax.plot(range(len(equity_curve)), equity_curve['balance'], marker='o', linestyle='-')
+                balance = equity_curve['balance'].to_numpy()
+                wins = equity_curve['trade_result'].to_numpy() == 'Winning'
+                trade_index = np.arange(len(balance))
                 
-                # Add trade markers
-                for i, row in equity_curve.iterrows():
-                    color = 'green' if row['trade_result'] == 'Winning' else 'red'
-                    ax.plot(i, row['balance'], marker='o', color=color)
-                
-                ax.set_title('Equity Curve')
-                ax.set_xlabel('Trade Number')
-                ax.set_ylabel('Balance')
-                ax.grid(True)
+                self._equity_line.set_data(trade_index, balance)
+                self._equity_scatter_win.set_offsets(np.column_stack((trade_index[wins], balance[wins])))
+                self._equity_scatter_lose.set_offsets(np.column_stack((trade_index[~wins], balance[~wins])))
                 
-                self.equity_fig.tight_layout()
-                self.equity_canvas.draw()
+                self._equity_ax.relim()
+                self._equity_ax.autoscale_view()
+                self.equity_canvas.draw_idle()
         except Exception as e:
             logger.error(f"Error updating equity graph: {e}")
+            self._equity_ax = None
             self.equity_fig.clear()
             ax = self.equity_fig.add_subplot(111)
             ax.text(0.5, 0.5, f"Error: {e}", ha='center', va='center')
-            self.equity_canvas.draw()
+            self.equity_canvas.draw_idle()
     
-    def update_win_rate_graph(self, stats):
-        """Update the win rate analysis graph."""
+    def update_win_rate_graph(self, breakdowns):
+        """Update the win rate analysis graph from get_win_rate_breakdowns data."""
         try:
-            self.win_rate_fig.clear()
-            
-            # Create subplots
             fig = self.win_rate_fig
             
-            # Win rate by stop loss
-            ax1 = fig.add_subplot(221)
-            labels = list(stats['by_stoploss'].keys())
-            win_rates = [stats['by_stoploss'][k]['win_rate'] for k in labels]
-            
-            ax1.bar(range(len(labels)), win_rates)
-            ax1.set_xticks(range(len(labels)))
-            ax1.set_xticklabels(labels)
-            ax1.set_ylim(0, 100)
-            ax1.set_title('Win Rate by Stop Loss')
-            ax1.set_ylabel('Win Rate (%)')
-            
-            # Win rate by ratio
-            ax2 = fig.add_subplot(222)
-            labels = list(stats['by_ratio'].keys())
-            win_rates = [stats['by_ratio'][k]['win_rate'] for k in labels]
+            # Create the 2x2 grid once and keep it across redraws
+            if self._win_rate_axes is None:
+                fig.clear()
+                self._win_rate_axes = fig.subplots(2, 2).ravel()
+                self._win_rate_bars = {}
             
-            ax2.bar(range(len(labels)), win_rates)
-            ax2.set_xticks(range(len(labels)))
-            ax2.set_xticklabels(labels)
-            ax2.set_ylim(0, 100)
-            ax2.set_title('Win Rate by Ratio')
-            
-            # Win rate by session
-            ax3 = fig.add_subplot(223)
-            labels = list(stats['by_session'].keys())
-            win_rates = [stats['by_session'][k]['win_rate'] for k in labels]
-            
-            ax3.bar(range(len(labels)), win_rates)
-            ax3.set_xticks(range(len(labels)))
-            ax3.set_xticklabels(labels)
-            ax3.set_ylim(0, 100)
-            ax3.set_title('Win Rate by Session')
-            ax3.set_ylabel('Win Rate (%)')
-            
-            # Win rate by position
-            ax4 = fig.add_subplot(224)
-            labels = list(stats['by_position'].keys())
-            win_rates = [stats['by_position'][k]['win_rate'] for k in labels]
-            
-            ax4.bar(range(len(labels)), win_rates)
-            ax4.set_xticks(range(len(labels)))
-            ax4.set_xticklabels(labels)
-            ax4.set_ylim(0, 100)
-            ax4.set_title('Win Rate by Position')
+            relayout = False
+            for ax, (facet, title, ylabel) in zip(self._win_rate_axes, self.WIN_RATE_FACETS):
+                buckets = breakdowns[facet]
+                labels = tuple(buckets)
+                win_rates = np.fromiter((bucket['win_rate'] for bucket in buckets.values()),
+                                        dtype=float, count=len(buckets))
+                
+                # Same buckets as last time: only the bar heights change
+                cached = self._win_rate_bars.get(facet)
+                if cached is not None and cached[0] == labels:
+                    for bar, height in zip(cached[1], win_rates):
+                        bar.set_height(height)
+                    continue
+                
+                ax.cla()
+                positions = np.arange(len(labels))
+                bars = ax.bar(positions, win_rates)
+                ax.set_xticks(positions)
+                ax.set_xticklabels(labels)
+                ax.set_ylim(0, 100)
+                ax.set_title(title)
+                if ylabel:
+                    ax.set_ylabel(ylabel)
+                
+                self._win_rate_bars[facet] = (labels, bars)
+                relayout = True
             
-            fig.tight_layout()
-            self.win_rate_canvas.draw()
+            if relayout:
+                fig.tight_layout()
+            self.win_rate_canvas.draw_idle()
         except Exception as e:
             logger.error(f"Error updating win rate graph: {e}")
+            self._win_rate_axes = None
             self.win_rate_fig.clear()
             ax = self.win_rate_fig.add_subplot(111)
             ax.text(0.5, 0.5, f"Error: {e}", ha='center', va='center')
-            self.win_rate_canvas.draw()
+            self.win_rate_canvas.draw_idle()
     
     def update_drawdown_graph(self):
         """Update the drawdown analysis graph."""
         try:
-            import sqlite3
-            conn = sqlite3.connect(self.current_db_path)
-            
-            # Get trading entries
-            query = """
-                SELECT * FROM trading_entries 
-                WHERE Result IN ('Winning', 'Losing')
-                ORDER BY StartDatetime
-            """
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
+            equity_curve, drawdown_data = self._latest_curves
             
-            if not df.empty:
-                # Calculate drawdown
-                drawdown_data = calculate_drawdown(df.to_dict('records'))
-                
-                # Plot drawdown
-                self.drawdown_fig.clear()
-                ax = self.drawdown_fig.add_subplot(111)
-                
-                # Generate equity curve for plotting
-                equity_curve = generate_equity_curve(df.to_dict('records'))
+            if equity_curve is not None:
+                # Reset the existing axes instead of rebuilding the figure
+                if self._drawdown_ax is None:
+                    self.drawdown_fig.clear()
+                    self._drawdown_ax = self.drawdown_fig.add_subplot(111)
+                ax = self._drawdown_ax
+                ax.cla()
                 
                 # Plot equity curve
                 ax.plot(range(len(equity_curve)), equity_curve['balance'], label='Balance')
                 
                 # Add drawdown periods
                 if drawdown_data['drawdown_periods']:
+                    from matplotlib.collections import PolyCollection
+                    
+                    # Map each datetime to its first trade number once
+                    positions = pd.Series(np.arange(len(equity_curve)), index=equity_curve['datetime'])
+                    positions = positions[~positions.index.duplicated()]
+                    last_idx = len(equity_curve) - 1
+                    
+                    spans = []
                     for period in drawdown_data['drawdown_periods']:
-                        start_idx = equity_curve[equity_curve['datetime'] == period['start']].index[0] if period['start'] in equity_curve['datetime'].values else 0
-                        end_idx = equity_curve[equity_curve['datetime'] == period['end']].index[0] if period['end'] in equity_curve['datetime'].values else len(equity_curve) - 1
-                        
-                        ax.axvspan(start_idx, end_idx, alpha=0.3, color='red')
+                        start_idx = positions.get(period['start'], 0)
+                        end_idx = positions.get(period['end'], last_idx)
+                        spans.append(((start_idx, 0), (start_idx, 1), (end_idx, 1), (end_idx, 0)))
+                    
+                    # Draw all periods as one collection spanning the full axis height
+                    ax.add_collection(
+                        PolyCollection(spans, transform=ax.get_xaxis_transform(), alpha=0.3, color='red'),
+                        autolim=False
+                    )
                 
                 ax.set_title(f'Drawdown Analysis (Max: {drawdown_data["max_drawdown_percent"]:.1f}%)')
                 ax.set_xlabel('Trade Number')
@@ -1028,13 +1531,14 @@ class BacktestPanel(ttk.Frame):
                 ax.grid(True)
                 
                 self.drawdown_fig.tight_layout()
-                self.drawdown_canvas.draw()
+                self.drawdown_canvas.draw_idle()
         except Exception as e:
             logger.error(f"Error updating drawdown graph: {e}")
+            self._drawdown_ax = None
             self.drawdown_fig.clear()
             ax = self.drawdown_fig.add_subplot(111)
             ax.text(0.5, 0.5, f"Error: {e}", ha='center', va='center')
-            self.drawdown_canvas.draw()
+            self.drawdown_canvas.draw_idle()
     
     def export_to_csv(self):
         """Export trading data to CSV."""
@@ -1046,19 +1550,15 @@ class BacktestPanel(ttk.Frame):
         filepath = asksaveasfilename(
             title="Export Trading Data",
             defaultextension=".csv",
-            filetypes=[("CSV Files", "*.csv")]
+            filetypes=[("CSV Files", "*.csv"), ("Compressed CSV Files", "*.csv.gz")]
         )
         
         if not filepath:
             return
         
         try:
-            # Connect to database
-            import sqlite3
-            conn = sqlite3.connect(self.current_db_path)
-            
             # Get trading entries
-            query = "SELECT * FROM trading_entries"
+            query = self._SQL_EXPORT
             
             # Apply filters
             conditions = []
@@ -1079,12 +1579,17 @@ class BacktestPanel(ttk.Frame):
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            # Execute query
-            df = pd.read_sql_query(query, conn, params=params)
-            conn.close()
-            
-            # Save to CSV
-            df.to_csv(filepath, index=False)
+            # Copy rows straight from the cursor to CSV, one batch at a time
+            cursor = self._get_connection().execute(query, params)
+            opener = gzip.open if filepath.endswith('.gz') else open
+            with opener(filepath, 'wt', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([description[0] for description in cursor.description])
+                while True:
+                    rows = cursor.fetchmany(10000)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
             
             messagebox.showinfo("Export", f"Data exported to {filepath}")
         except Exception as e:
@@ -1092,7 +1597,7 @@ class BacktestPanel(ttk.Frame):
             messagebox.showerror("Error", f"Failed to export data: {e}")
     
     def export_graphs(self):
-        """Export graphs to image files."""
+        """Export graphs to PNG, PDF or SVG files."""
         if not self.current_db_path:
             messagebox.showerror("Error", "Please open a database first")
             return
@@ -1105,17 +1610,24 @@ class BacktestPanel(ttk.Frame):
             return
         
         try:
-            # Save equity curve
-            equity_path = os.path.join(directory, f"{self.current_symbol}_equity_curve.png")
-            self.equity_fig.savefig(equity_path, dpi=300, bbox_inches='tight')
+            # Draw any graphs that have not been rendered since the last update
+            if self._latest_stats is not None:
+                for name in [name for name, dirty in self._dirty.items() if dirty]:
+                    self._render_graph(name)
+            
+            # Vector formats need no DPI; the figures are already laid out with tight_layout
+            extension = self.graph_format_var.get()
+            save_kwargs = {'dpi': self.GRAPH_EXPORT_DPI} if extension == "png" else {}
             
-            # Save win rate analysis
-            win_rate_path = os.path.join(directory, f"{self.current_symbol}_win_rate_analysis.png")
-            self.win_rate_fig.savefig(win_rate_path, dpi=300, bbox_inches='tight')
+            exports = [
+                (self.equity_fig, f"{self.current_symbol}_equity_curve.{extension}"),
+                (self.win_rate_fig, f"{self.current_symbol}_win_rate_analysis.{extension}"),
+                (self.drawdown_fig, f"{self.current_symbol}_drawdown_analysis.{extension}")
+            ]
             
-            # Save drawdown analysis
-            drawdown_path = os.path.join(directory, f"{self.current_symbol}_drawdown_analysis.png")
-            self.drawdown_fig.savefig(drawdown_path, dpi=300, bbox_inches='tight')
+            # Save on the main thread; the figures belong to live Tk canvases and are not thread-safe
+            for fig, filename in exports:
+                fig.savefig(os.path.join(directory, filename), **save_kwargs)
             
             messagebox.showinfo("Export", f"Graphs exported to {directory}")
         except Exception as e:
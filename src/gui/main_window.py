@@ -4,27 +4,180 @@ Main Application Window
 This module contains the main application window and UI framework.
 """
 
+import atexit
+import copy
 import logging
 import os
+import re
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.filedialog import askopenfilename
 import threading
+import queue
+from functools import partial
 
-from src.utils.config import get_config, save_config
+from src.utils.config import get_config, invalidate_pip_settings, save_config
+from src.data.database import close_connection
 from src.gui.setup_panel import SetupPanel
-from src.gui.backtest_panel import BacktestPanel
+from src.gui.backtest_panel import BacktestPanel, shutdown_backtest_workers
 
 logger = logging.getLogger(__name__)
 
+# Resolved once at import instead of on every window configure
+_RESOURCES_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'resources'))
+_ICON_PATH = os.path.join(_RESOURCES_DIR, 'icon.ico')
+_ICON_EXISTS = os.path.exists(_ICON_PATH)
+_ICON_PNG_PATH = os.path.join(_RESOURCES_DIR, 'icon.png')
+_ICON_PNG_EXISTS = os.path.exists(_ICON_PNG_PATH)
+
+# Shared widget constants for the settings dialog
+_HEADER_FONT = ("Helvetica", 12, "bold")
+_INT_LIST_RE = re.compile(r'[-+]?\d+')
+_HEX_COLOR_RE = re.compile(r'#[0-9A-Fa-f]{6}')
+_STYLE_KEYS = ("gui.accent_color", "gui.font.family", "gui.font.size")
+_FONT_FAMILIES = ("Arial", "Helvetica", "Times", "Courier", "Verdana", "Tahoma")
+_TIMEZONES = ("Etc/GMT-12", "Etc/GMT-11", "Etc/GMT-10", "Etc/GMT-9", "Etc/GMT-8", "Etc/GMT-7", "Etc/GMT-6", "Etc/GMT-5", "Etc/GMT-4", "Etc/GMT-3", "Etc/GMT-2", "Etc/GMT-1", "Etc/GMT", "Etc/GMT+1", "Etc/GMT+2", "Etc/GMT+3", "Etc/GMT+4", "Etc/GMT+5", "Etc/GMT+6", "Etc/GMT+7", "Etc/GMT+8", "Etc/GMT+9", "Etc/GMT+10", "Etc/GMT+11", "Etc/GMT+12")
+
+def _parse_int_list(text):
+    """
+    Parse the integers out of a comma-separated settings field.
+    
+    Args:
+        text (str): Text such as "20, 25,30,"
+        
+    Returns:
+        list: The integers in order of appearance
+    """
+    return list(map(int, _INT_LIST_RE.findall(text)))
+
+def _flatten(config, prefix=''):
+    """
+    Flatten a nested config dictionary into dotted keys.
+    
+    Args:
+        config (dict): The configuration dictionary
+        prefix (str, optional): Dotted path of config within the root
+        
+    Returns:
+        dict: Mapping such as {'gui.font.family': 'Arial'}
+    """
+    flat = {}
+    for key, value in config.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+def _unflatten_into(config, updates):
+    """
+    Write dotted-key values back into a nested config dictionary.
+    
+    Args:
+        config (dict): The configuration dictionary to update in place
+        updates (dict): Mapping of dotted keys to new values
+    """
+    for path, value in updates.items():
+        *parents, leaf = path.split('.')
+        target = config
+        for part in parents:
+            target = target[part]
+        target[leaf] = value
+
+def _grid_cells(cells):
+    """
+    Grid a batch of widgets in one pass.
+    
+    Args:
+        cells (list): (widget, row, column) tuples
+    """
+    for widget, row, column in cells:
+        widget.grid(row=row, column=column, sticky=tk.W, padx=10, pady=2)
+
 class MainApplication(ttk.Frame):
     """Main application window."""
     
+    # (style name, options, uses configured font)
+    _STYLE_SPEC = (
+        ("TFrame", {"background": "#f5f5f5"}, False),
+        ("TNotebook", {"background": "#f5f5f5"}, False),
+        ("TNotebook.Tab", {"background": "#e0e0e0", "padding": [10, 2]}, True),
+        ("TButton", {"padding": 6, "relief": "flat", "background": "#e0e0e0"}, True),
+        ("TLabel", {"background": "#f5f5f5"}, True),
+        ("TEntry", {"padding": 6}, True),
+        ("TCombobox", {"padding": 4}, True)
+    )
+    
+    # Settings rows as (label, kind, config key, widget options); "browse" names a
+    # browse handler and "live" binds a traced StringVar
+    GENERAL_SPEC = (
+        ("News Settings", "header", None, {}),
+        ("Excel Path:", "entry", "news.excel_path", {"width": 40, "browse": "browse_excel_path"}),
+        ("Hours Before News:", "spinbox", "news.hours_before", {"from_": 1, "to": 24, "width": 5}),
+        ("Hours After News:", "spinbox", "news.hours_after", {"from_": 1, "to": 24, "width": 5})
+    )
+    DATABASE_SPEC = (
+        ("Database Path:", "entry", "database.path", {"width": 40, "browse": "browse_db_path"}),
+        ("MetaTrader 5 Settings", "header", None, {}),
+        ("Timezone:", "combobox", "mt5.timezone", {"values": _TIMEZONES}),
+        ("History Days:", "spinbox", "mt5.history_days", {"from_": 1, "to": 1000, "width": 5})
+    )
+    TRADING_SPEC = (
+        ("Stoploss Sizes (comma-separated):", "int_list", "trading.stoploss_sizes", {"width": 20}),
+        ("Trade Ratios (comma-separated):", "int_list", "trading.trade_ratios", {"width": 20})
+    )
+    APPEARANCE_SPEC = (
+        ("Accent Color:", "entry", "gui.accent_color", {"width": 10, "live": True}),
+        ("Font Family:", "combobox", "gui.font.family", {"values": _FONT_FAMILIES}),
+        ("Font Size:", "spinbox", "gui.font.size", {"from_": 8, "to": 16, "width": 5})
+    )
+    
+    # Interval for handing background job results to the main thread
+    RESULT_POLL_MS = 30
+    
+    # Background jobs that can run at the same time
+    BACKGROUND_WORKERS = 2
+    
+    # Delay that coalesces several config changes into one write
+    CONFIG_SAVE_DELAY_MS = 500
+    
+    # Pause after the last keystroke before the accent preview updates
+    COLOR_PREVIEW_DELAY_MS = 100
+    
+    # (style name, state highlighted with the accent color)
+    _STYLE_MAP_SPEC = (
+        ("TNotebook.Tab", "selected"),
+        ("TButton", "active")
+    )
+    
     def __init__(self, master=None):
         """Initialize the main application window."""
         super().__init__(master)
         self.master = master
         self.config = get_config()
+        self._style = ttk.Style()
+        
+        # Small pool of long-lived workers so one slow job does not hold up the rest;
+        # as daemons they never hold up exit
+        self._work_q = queue.Queue()
+        self._results = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"background-worker-{i}", daemon=True)
+            for i in range(self.BACKGROUND_WORKERS)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._drain_id = self.master.after(self.RESULT_POLL_MS, self._drain_results)
+        self._save_after_id = None
+        
+        # Config writes are numbered so an older snapshot never overwrites a newer one
+        self._config_save_lock = threading.Lock()
+        self._config_save_seq = 0
+        self._config_saved_seq = 0
+        self._icon_img = None
+        self._icon_set = False
+        self._settings_win = None
         
         self.setup_ui()
         self.pack(fill=tk.BOTH, expand=True)
@@ -47,13 +200,22 @@ class MainApplication(ttk.Frame):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Create setup panel
-        self.setup_panel = SetupPanel(self.notebook, self)
-        self.notebook.add(self.setup_panel, text="Setup")
+        # Add placeholder tabs; each panel is built the first time its tab is shown
+        self.setup_panel = None
+        self.backtest_panel = None
+        self._pending_db = {}
+        self._panel_factories = {
+            0: (SetupPanel, "setup_panel"),
+            1: (BacktestPanel, "backtest_panel")
+        }
+        self._panel_placeholders = {}
+        for index, text in ((0, "Setup"), (1, "Backtest")):
+            placeholder = ttk.Frame(self.notebook)
+            self.notebook.add(placeholder, text=text)
+            self._panel_placeholders[index] = placeholder
         
-        # Create backtest panel
-        self.backtest_panel = BacktestPanel(self.notebook, self)
-        self.notebook.add(self.backtest_panel, text="Backtest")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_main_tab_changed)
+        self._ensure_panel(self.notebook.index("current"))
         
         # Create status bar
         self.status_var = tk.StringVar()
@@ -64,6 +226,52 @@ class MainApplication(ttk.Frame):
         # Create menu
         self.create_menu()
     
+    def _on_main_tab_changed(self, event):
+        """Build the panel for the selected tab if needed."""
+        self._ensure_panel(self.notebook.index("current"))
+    
+    def _ensure_panel(self, index):
+        """
+        Return the panel for a main tab, building it on first use.
+        
+        Args:
+            index (int): The notebook tab index
+            
+        Returns:
+            ttk.Frame: The panel shown in that tab
+        """
+        panel_class, attr = self._panel_factories[index]
+        panel = getattr(self, attr)
+        if panel is not None:
+            return panel
+        
+        panel = panel_class(self.notebook, self)
+        panel.pack(in_=self._panel_placeholders[index], fill=tk.BOTH, expand=True)
+        setattr(self, attr, panel)
+        
+        # Replay a database opened before the panel existed
+        pending = self._pending_db.pop(attr, None)
+        if pending:
+            panel.on_database_opened(*pending)
+        
+        return panel
+    
+    def notify_database_opened(self, db_path, symbol, panels=("setup_panel", "backtest_panel")):
+        """
+        Forward an opened database to the panels, buffering it for panels not built yet.
+        
+        Args:
+            db_path (str): Path to the database file
+            symbol (str): The trading symbol
+            panels (tuple, optional): Attribute names of the panels to notify
+        """
+        for attr in panels:
+            panel = getattr(self, attr)
+            if panel is None:
+                self._pending_db[attr] = (db_path, symbol)
+            else:
+                panel.on_database_opened(db_path, symbol)
+    
     def create_menu(self):
         """Create the menu bar."""
         menubar = tk.Menu(self.master)
@@ -94,22 +302,21 @@ class MainApplication(ttk.Frame):
     
     def apply_styles(self):
         """Apply styling to the application."""
-        style = ttk.Style()
-        
-        # Configure colors
-        accent_color = self.config['gui']['accent_color']
+        style = self._style
         
-        style.configure("TFrame", background="#f5f5f5")
-        style.configure("TNotebook", background="#f5f5f5")
-        style.configure("TNotebook.Tab", background="#e0e0e0", padding=[10, 2], font=(self.config['gui']['font']['family'], self.config['gui']['font']['size']))
-        style.map("TNotebook.Tab", background=[("selected", accent_color)], foreground=[("selected", "#ffffff")])
+        # Read the configured font and colors once
+        gui_config = self.config['gui']
+        font_tuple = (gui_config['font']['family'], gui_config['font']['size'])
+        accent_color = gui_config['accent_color']
         
-        style.configure("TButton", padding=6, relief="flat", background="#e0e0e0", font=(self.config['gui']['font']['family'], self.config['gui']['font']['size']))
-        style.map("TButton", background=[("active", accent_color)], foreground=[("active", "#ffffff")])
+        for name, opts, uses_font in self._STYLE_SPEC:
+            if uses_font:
+                style.configure(name, font=font_tuple, **opts)
+            else:
+                style.configure(name, **opts)
         
-        style.configure("TLabel", background="#f5f5f5", font=(self.config['gui']['font']['family'], self.config['gui']['font']['size']))
-        style.configure("TEntry", padding=6, font=(self.config['gui']['font']['family'], self.config['gui']['font']['size']))
-        style.configure("TCombobox", padding=4, font=(self.config['gui']['font']['family'], self.config['gui']['font']['size']))
+        for name, state in self._STYLE_MAP_SPEC:
+            style.map(name, background=[(state, accent_color)], foreground=[(state, "#ffffff")])
         
         # Apply styles to the root window
         self.master.configure(background="#f5f5f5")
@@ -129,13 +336,17 @@ class MainApplication(ttk.Frame):
         y_position = self.config['gui']['window_position']['y']
         self.master.geometry(f"+{x_position}+{y_position}")
         
-        # Set window icon if available
-        try:
-            icon_path = os.path.join(os.path.dirname(__file__), '..', '..', 'resources', 'icon.ico')
-            if os.path.exists(icon_path):
-                self.master.iconbitmap(icon_path)
-        except Exception as e:
-            logger.warning(f"Could not set window icon: {e}")
+        # Set window icon once; a PNG is decoded into a PhotoImage Tk keeps cached
+        if not self._icon_set:
+            try:
+                if _ICON_PNG_EXISTS:
+                    self._icon_img = tk.PhotoImage(file=_ICON_PNG_PATH)
+                    self.master.iconphoto(True, self._icon_img)
+                elif _ICON_EXISTS:
+                    self.master.iconbitmap(_ICON_PATH)
+            except Exception as e:
+                logger.warning(f"Could not set window icon: {e}")
+            self._icon_set = True
         
         # Make window resizable
         self.master.resizable(True, True)
@@ -168,8 +379,7 @@ class MainApplication(ttk.Frame):
                 self.status_var.set(f"Database opened: {db_path}")
                 
                 # Notify panels
-                self.setup_panel.on_database_opened(db_path, symbol)
-                self.backtest_panel.on_database_opened(db_path, symbol)
+                self.notify_database_opened(db_path, symbol)
                 
                 # Switch to backtest tab
                 self.notebook.select(1)  # Backtest tab index
@@ -184,7 +394,7 @@ class MainApplication(ttk.Frame):
         """Create a new database."""
         # Show setup panel and trigger database creation
         self.notebook.select(0)  # Setup tab index
-        self.setup_panel.trigger_database_creation()
+        self._ensure_panel(0).trigger_database_creation()
     
     def import_news(self):
         """Import news data from Excel."""
@@ -201,7 +411,7 @@ class MainApplication(ttk.Frame):
         if excel_path:
             # Trigger news import in setup panel
             self.notebook.select(0)  # Setup tab index
-            self.setup_panel.import_news_from_excel(excel_path, self.current_db_path)
+            self._ensure_panel(0).import_news_from_excel(excel_path, self.current_db_path)
     
     def analyze_news(self):
         """Analyze news impact."""
@@ -211,16 +421,25 @@ class MainApplication(ttk.Frame):
         
         # Trigger news analysis in setup panel
         self.notebook.select(0)  # Setup tab index
-        self.setup_panel.analyze_news_impact(self.current_db_path, self.current_symbol)
+        self._ensure_panel(0).analyze_news_impact(self.current_db_path, self.current_symbol)
     
     def open_settings(self):
         """Open settings dialog."""
-        # Create a new dialog for settings
-        settings_dialog = tk.Toplevel(self.master)
+        # Reuse the hidden dialog after the first open
+        if self._settings_win is not None:
+            self._reset_settings_fields()
+            self._settings_win.deiconify()
+            self._settings_win.lift()
+            self._settings_win.grab_set()
+            return
+        
+        # Create the dialog for settings; closing it only hides it
+        settings_dialog = self._settings_win = tk.Toplevel(self.master)
         settings_dialog.title("Settings")
         settings_dialog.geometry("600x400")
         settings_dialog.transient(self.master)
         settings_dialog.grab_set()
+        settings_dialog.protocol("WM_DELETE_WINDOW", self._hide_settings)
         
         # Create notebook for settings categories
         settings_notebook = ttk.Notebook(settings_dialog)
@@ -242,161 +461,185 @@ class MainApplication(ttk.Frame):
         appearance_frame = ttk.Frame(settings_notebook)
         settings_notebook.add(appearance_frame, text="Appearance")
         
-        # Populate settings frames
-        self.populate_general_settings(general_frame)
-        self.populate_database_settings(database_frame)
-        self.populate_trading_settings(trading_frame)
-        self.populate_appearance_settings(appearance_frame)
+        # Populate each settings frame the first time its tab is shown
+        self.settings_vars = {}
+        self._settings_widgets = {}
+        self._flat_cfg = _flatten(self.config)
+        self._settings_populated = {}
+        self._settings_tabs = [
+            (general_frame, self.populate_general_settings),
+            (database_frame, self.populate_database_settings),
+            (trading_frame, self.populate_trading_settings),
+            (appearance_frame, self.populate_appearance_settings)
+        ]
+        settings_notebook.bind("<<NotebookTabChanged>>", self._on_settings_tab)
+        self._populate_settings_tab(settings_notebook.index("current"))
         
         # Add save button
-        save_button = ttk.Button(settings_dialog, text="Save Settings", command=lambda: self.save_settings(settings_dialog))
+        save_button = ttk.Button(settings_dialog, text="Save Settings", command=self.save_settings)
         save_button.pack(side=tk.RIGHT, padx=10, pady=10)
     
+    def _hide_settings(self):
+        """Hide the settings dialog, keeping its widgets for the next open."""
+        self._settings_win.grab_release()
+        self._settings_win.withdraw()
+    
+    def _reset_settings_fields(self):
+        """Load the current config into the already-built settings fields."""
+        self._flat_cfg = _flatten(self.config)
+        
+        for key, widget in self._settings_widgets.items():
+            value = self._flat_cfg[key]
+            widget.delete(0, tk.END)
+            widget.insert(0, ','.join(str(x) for x in value) if isinstance(value, list) else value)
+        
+        symbols = self._flat_cfg['mt5.symbols']
+        for pair, var in self.settings_vars.get('trading.currency_pairs', ()):
+            var.set(pair in symbols)
+    
+    def _on_settings_tab(self, event):
+        """Build the selected settings tab if it has not been shown yet."""
+        self._populate_settings_tab(event.widget.index("current"))
+    
+    def _populate_settings_tab(self, index):
+        """Populate the settings frame at the given tab index once."""
+        if self._settings_populated.get(index):
+            return
+        
+        frame, populate = self._settings_tabs[index]
+        populate(frame)
+        frame.update_idletasks()
+        self._settings_populated[index] = True
+    
+    def _build_rows(self, parent, spec, start_row=0):
+        """
+        Grid one label/widget row per spec entry and register its widget.
+        
+        Fields are read straight from their widget on save; only entries marked
+        "live" get a Tk variable so they can be traced.
+        
+        Args:
+            parent (ttk.Frame): The settings frame
+            spec (tuple): (label, kind, config key, widget options) entries
+            start_row (int, optional): The first grid row to use
+            
+        Returns:
+            int: The next free grid row
+        """
+        row = start_row
+        for label, kind, cfg_key, widget_opts in spec:
+            if kind == "header":
+                ttk.Label(parent, text=label, font=_HEADER_FONT).grid(row=row, column=0, columnspan=2, sticky=tk.W, padx=10, pady=10)
+                row += 1
+                continue
+            
+            ttk.Label(parent, text=label).grid(row=row, column=0, sticky=tk.W, padx=10, pady=5)
+            
+            value = self._flat_cfg[cfg_key]
+            text = ','.join(str(x) for x in value) if kind == "int_list" else str(value)
+            opts = dict(widget_opts)
+            browse = opts.pop("browse", None)
+            live = opts.pop("live", False)
+            if kind == "spinbox":
+                widget = ttk.Spinbox(parent, **opts)
+            elif kind == "combobox":
+                widget = ttk.Combobox(parent, **opts)
+            else:
+                widget = ttk.Entry(parent, **opts)
+            widget.grid(row=row, column=1, sticky=tk.W, padx=5, pady=5)
+            
+            if live:
+                var = tk.StringVar(value=text)
+                widget.configure(textvariable=var)
+                self.settings_vars[cfg_key] = var
+            else:
+                widget.insert(0, text)
+            self._settings_widgets[cfg_key] = widget
+            
+            if browse:
+                browse_button = ttk.Button(parent, text="Browse", command=partial(getattr(self, browse), widget))
+                browse_button.grid(row=row, column=2, padx=5, pady=5)
+            
+            row += 1
+        
+        return row
+    
     def populate_general_settings(self, parent):
         """Populate general settings frame."""
-        # News settings
-        ttk.Label(parent, text="News Settings", font=("Helvetica", 12, "bold")).grid(row=0, column=0, columnspan=2, sticky=tk.W, padx=10, pady=10)
-        
-        ttk.Label(parent, text="Excel Path:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
-        excel_path_var = tk.StringVar(value=self.config['news']['excel_path'])
-        excel_path_entry = ttk.Entry(parent, textvariable=excel_path_var, width=40)
-        excel_path_entry.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
-        browse_button = ttk.Button(parent, text="Browse", command=lambda: self.browse_excel_path(excel_path_var))
-        browse_button.grid(row=1, column=2, padx=5, pady=5)
-        
-        ttk.Label(parent, text="Hours Before News:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
-        hours_before_var = tk.IntVar(value=self.config['news']['hours_before'])
-        hours_before_spinbox = ttk.Spinbox(parent, from_=1, to=24, textvariable=hours_before_var, width=5)
-        hours_before_spinbox.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(parent, text="Hours After News:").grid(row=3, column=0, sticky=tk.W, padx=10, pady=5)
-        hours_after_var = tk.IntVar(value=self.config['news']['hours_after'])
-        hours_after_spinbox = ttk.Spinbox(parent, from_=1, to=24, textvariable=hours_after_var, width=5)
-        hours_after_spinbox.grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        # Save references to variables
-        self.settings_vars = {
-            'news.excel_path': excel_path_var,
-            'news.hours_before': hours_before_var,
-            'news.hours_after': hours_after_var
-        }
+        self._build_rows(parent, self.GENERAL_SPEC)
     
     def populate_database_settings(self, parent):
         """Populate database settings frame."""
-        ttk.Label(parent, text="Database Path:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
-        db_path_var = tk.StringVar(value=self.config['database']['path'])
-        db_path_entry = ttk.Entry(parent, textvariable=db_path_var, width=40)
-        db_path_entry.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
-        browse_button = ttk.Button(parent, text="Browse", command=lambda: self.browse_db_path(db_path_var))
-        browse_button.grid(row=0, column=2, padx=5, pady=5)
-        
-        # MT5 settings
-        ttk.Label(parent, text="MetaTrader 5 Settings", font=("Helvetica", 12, "bold")).grid(row=1, column=0, columnspan=2, sticky=tk.W, padx=10, pady=10)
-        
-        ttk.Label(parent, text="Timezone:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
-        timezone_var = tk.StringVar(value=self.config['mt5']['timezone'])
-        timezones = ["Etc/GMT-12", "Etc/GMT-11", "Etc/GMT-10", "Etc/GMT-9", "Etc/GMT-8", "Etc/GMT-7", "Etc/GMT-6", "Etc/GMT-5", "Etc/GMT-4", "Etc/GMT-3", "Etc/GMT-2", "Etc/GMT-1", "Etc/GMT", "Etc/GMT+1", "Etc/GMT+2", "Etc/GMT+3", "Etc/GMT+4", "Etc/GMT+5", "Etc/GMT+6", "Etc/GMT+7", "Etc/GMT+8", "Etc/GMT+9", "Etc/GMT+10", "Etc/GMT+11", "Etc/GMT+12"]
-        timezone_combo = ttk.Combobox(parent, textvariable=timezone_var, values=timezones)
-        timezone_combo.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(parent, text="History Days:").grid(row=3, column=0, sticky=tk.W, padx=10, pady=5)
-        history_days_var = tk.IntVar(value=self.config['mt5']['history_days'])
-        history_days_spinbox = ttk.Spinbox(parent, from_=1, to=1000, textvariable=history_days_var, width=5)
-        history_days_spinbox.grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        # Add to settings vars
-        self.settings_vars.update({
-            'database.path': db_path_var,
-            'mt5.timezone': timezone_var,
-            'mt5.history_days': history_days_var
-        })
+        self._build_rows(parent, self.DATABASE_SPEC)
     
     def populate_trading_settings(self, parent):
         """Populate trading settings frame."""
-        # Stoploss sizes
-        ttk.Label(parent, text="Stoploss Sizes (comma-separated):").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
-        sl_sizes_str = ','.join(str(x) for x in self.config['trading']['stoploss_sizes'])
-        sl_sizes_var = tk.StringVar(value=sl_sizes_str)
-        sl_sizes_entry = ttk.Entry(parent, textvariable=sl_sizes_var, width=20)
-        sl_sizes_entry.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        # Trade ratios
-        ttk.Label(parent, text="Trade Ratios (comma-separated):").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
-        ratios_str = ','.join(str(x) for x in self.config['trading']['trade_ratios'])
-        ratios_var = tk.StringVar(value=ratios_str)
-        ratios_entry = ttk.Entry(parent, textvariable=ratios_var, width=20)
-        ratios_entry.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        row = self._build_rows(parent, self.TRADING_SPEC)
         
         # Currency pairs list
-        ttk.Label(parent, text="Currency Pairs:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
+        ttk.Label(parent, text="Currency Pairs:").grid(row=row, column=0, sticky=tk.W, padx=10, pady=5)
         frame = ttk.Frame(parent)
-        frame.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        frame.grid(row=row, column=1, sticky=tk.W, padx=5, pady=5)
         
-        currency_pairs = self.config['mt5']['symbols']
+        currency_pairs = self._flat_cfg['mt5.symbols']
         currency_vars = []
+        cells = []
         
-        # Display symbols in a 3-column grid
+        # Create all checkbuttons first, then lay them out in a 3-column grid in one idle pass
         for i, pair in enumerate(currency_pairs):
             var = tk.BooleanVar(value=True)
             currency_vars.append((pair, var))
             cb = ttk.Checkbutton(frame, text=pair, variable=var)
-            cb.grid(row=i//3, column=i%3, sticky=tk.W, padx=10, pady=2)
+            cells.append((cb, i//3, i%3))
+        frame.after_idle(_grid_cells, cells)
         
-        # Add to settings vars
-        self.settings_vars.update({
-            'trading.stoploss_sizes': sl_sizes_var,
-            'trading.trade_ratios': ratios_var,
-            'trading.currency_pairs': currency_vars
-        })
+        self.settings_vars['trading.currency_pairs'] = currency_vars
     
     def populate_appearance_settings(self, parent):
         """Populate appearance settings frame."""
-        # Accent color
-        ttk.Label(parent, text="Accent Color:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
-        accent_color_var = tk.StringVar(value=self.config['gui']['accent_color'])
-        accent_color_entry = ttk.Entry(parent, textvariable=accent_color_var, width=10)
-        accent_color_entry.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
-        color_preview = tk.Frame(parent, width=20, height=20, bg=self.config['gui']['accent_color'])
-        color_preview.grid(row=0, column=2, padx=5)
-        accent_color_var.trace_add("write", lambda *args: color_preview.configure(bg=accent_color_var.get()))
-        
-        # Font settings
-        ttk.Label(parent, text="Font Family:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
-        font_family_var = tk.StringVar(value=self.config['gui']['font']['family'])
-        font_families = ["Arial", "Helvetica", "Times", "Courier", "Verdana", "Tahoma"]
-        font_family_combo = ttk.Combobox(parent, textvariable=font_family_var, values=font_families)
-        font_family_combo.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(parent, text="Font Size:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
-        font_size_var = tk.IntVar(value=self.config['gui']['font']['size'])
-        font_size_spinbox = ttk.Spinbox(parent, from_=8, to=16, textvariable=font_size_var, width=5)
-        font_size_spinbox.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        row = self._build_rows(parent, self.APPEARANCE_SPEC)
+        
+        # Preview the accent color next to its entry
+        accent_color_var = self.settings_vars['gui.accent_color']
+        self._color_preview = tk.Frame(parent, width=20, height=20, bg=accent_color_var.get())
+        self._color_preview.grid(row=0, column=2, padx=5)
+        self._color_after = None
+        accent_color_var.trace_add("write", self._queue_color_preview)
         
         # Window position
-        ttk.Label(parent, text="Default Window Position:").grid(row=3, column=0, sticky=tk.W, padx=10, pady=5)
+        ttk.Label(parent, text="Default Window Position:").grid(row=row, column=0, sticky=tk.W, padx=10, pady=5)
         position_frame = ttk.Frame(parent)
-        position_frame.grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
+        position_frame.grid(row=row, column=1, sticky=tk.W, padx=5, pady=5)
         
         ttk.Label(position_frame, text="X:").pack(side=tk.LEFT)
-        x_pos_var = tk.IntVar(value=self.config['gui']['window_position']['x'])
-        x_pos_spinbox = ttk.Spinbox(position_frame, from_=0, to=3000, textvariable=x_pos_var, width=5)
+        x_pos_spinbox = ttk.Spinbox(position_frame, from_=0, to=3000, width=5)
+        x_pos_spinbox.insert(0, self._flat_cfg['gui.window_position.x'])
         x_pos_spinbox.pack(side=tk.LEFT, padx=5)
         
         ttk.Label(position_frame, text="Y:").pack(side=tk.LEFT, padx=(10, 0))
-        y_pos_var = tk.IntVar(value=self.config['gui']['window_position']['y'])
-        y_pos_spinbox = ttk.Spinbox(position_frame, from_=0, to=3000, textvariable=y_pos_var, width=5)
+        y_pos_spinbox = ttk.Spinbox(position_frame, from_=0, to=3000, width=5)
+        y_pos_spinbox.insert(0, self._flat_cfg['gui.window_position.y'])
         y_pos_spinbox.pack(side=tk.LEFT, padx=5)
         
-        # Add to settings vars
-        self.settings_vars.update({
-            'gui.accent_color': accent_color_var,
-            'gui.font.family': font_family_var,
-            'gui.font.size': font_size_var,
-            'gui.window_position.x': x_pos_var,
-            'gui.window_position.y': y_pos_var
+        self._settings_widgets.update({
+            'gui.window_position.x': x_pos_spinbox,
+            'gui.window_position.y': y_pos_spinbox
         })
     
-    def browse_excel_path(self, var):
+    def _queue_color_preview(self, *args):
+        """Restart the timer that refreshes the accent color preview."""
+        if self._color_after:
+            self.master.after_cancel(self._color_after)
+        self._color_after = self.master.after(self.COLOR_PREVIEW_DELAY_MS, self._apply_color_preview)
+    
+    def _apply_color_preview(self):
+        """Show the typed accent color once it is a complete hex color."""
+        self._color_after = None
+        color = self.settings_vars['gui.accent_color'].get()
+        if _HEX_COLOR_RE.fullmatch(color) and self._color_preview.winfo_exists():
+            self._color_preview.configure(bg=color)
+    
+    def browse_excel_path(self, entry):
         """Browse for Excel file path."""
         path = askopenfilename(
             title="Select News Excel File",
@@ -404,55 +647,69 @@ class MainApplication(ttk.Frame):
             initialdir=os.path.expanduser("~")
         )
         if path:
-            var.set(path)
+            entry.delete(0, tk.END)
+            entry.insert(0, path)
     
-    def browse_db_path(self, var):
+    def browse_db_path(self, entry):
         """Browse for database directory."""
         path = tk.filedialog.askdirectory(
             title="Select Database Directory",
             initialdir=os.path.expanduser("~")
         )
         if path:
-            var.set(path)
+            entry.delete(0, tk.END)
+            entry.insert(0, path)
     
-    def save_settings(self, dialog):
+    def save_settings(self):
         """Save settings and close the dialog."""
         try:
-            # Update config with new values
+            # Update config with new values; tabs that were never opened are skipped
+            widgets = self._settings_widgets
+            updates = {}
+            
             # News settings
-            self.config['news']['excel_path'] = self.settings_vars['news.excel_path'].get()
-            self.config['news']['hours_before'] = self.settings_vars['news.hours_before'].get()
-            self.config['news']['hours_after'] = self.settings_vars['news.hours_after'].get()
+            if 'news.excel_path' in widgets:
+                updates['news.excel_path'] = widgets['news.excel_path'].get()
+                updates['news.hours_before'] = int(widgets['news.hours_before'].get())
+                updates['news.hours_after'] = int(widgets['news.hours_after'].get())
             
             # Database settings
-            self.config['database']['path'] = self.settings_vars['database.path'].get()
-            self.config['mt5']['timezone'] = self.settings_vars['mt5.timezone'].get()
-            self.config['mt5']['history_days'] = self.settings_vars['mt5.history_days'].get()
+            if 'database.path' in widgets:
+                updates['database.path'] = widgets['database.path'].get()
+                updates['mt5.timezone'] = widgets['mt5.timezone'].get()
+                updates['mt5.history_days'] = int(widgets['mt5.history_days'].get())
             
             # Trading settings
-            self.config['trading']['stoploss_sizes'] = [int(x.strip()) for x in self.settings_vars['trading.stoploss_sizes'].get().split(',')]
-            self.config['trading']['trade_ratios'] = [int(x.strip()) for x in self.settings_vars['trading.trade_ratios'].get().split(',')]
-            
-            # Update symbols list based on checkboxes
-            selected_symbols = [pair for pair, var in self.settings_vars['trading.currency_pairs'] if var.get()]
-            if selected_symbols:  # Only update if at least one symbol is selected
-                self.config['mt5']['symbols'] = selected_symbols
+            if 'trading.stoploss_sizes' in widgets:
+                updates['trading.stoploss_sizes'] = _parse_int_list(widgets['trading.stoploss_sizes'].get())
+                updates['trading.trade_ratios'] = _parse_int_list(widgets['trading.trade_ratios'].get())
+                
+                # Update symbols list based on checkboxes
+                selected_symbols = [pair for pair, var in self.settings_vars['trading.currency_pairs'] if var.get()]
+                if selected_symbols:  # Only update if at least one symbol is selected
+                    updates['mt5.symbols'] = selected_symbols
             
             # Appearance settings
-            self.config['gui']['accent_color'] = self.settings_vars['gui.accent_color'].get()
-            self.config['gui']['font']['family'] = self.settings_vars['gui.font.family'].get()
-            self.config['gui']['font']['size'] = self.settings_vars['gui.font.size'].get()
-            self.config['gui']['window_position']['x'] = self.settings_vars['gui.window_position.x'].get()
-            self.config['gui']['window_position']['y'] = self.settings_vars['gui.window_position.y'].get()
+            if 'gui.accent_color' in widgets:
+                updates['gui.accent_color'] = widgets['gui.accent_color'].get()
+                updates['gui.font.family'] = widgets['gui.font.family'].get()
+                updates['gui.font.size'] = int(widgets['gui.font.size'].get())
+                updates['gui.window_position.x'] = int(widgets['gui.window_position.x'].get())
+                updates['gui.window_position.y'] = int(widgets['gui.window_position.y'].get())
+            
+            style_changed = any(key in updates and updates[key] != self._flat_cfg[key] for key in _STYLE_KEYS)
+            _unflatten_into(self.config, updates)
+            invalidate_pip_settings()
             
             # Save config to file
-            save_config(self.config)
+            self.schedule_config_save()
             
-            # Apply new styles
-            self.apply_styles()
+            # Apply new styles only if the font or accent color changed
+            if style_changed:
+                self.apply_styles()
             
             # Close dialog
-            dialog.destroy()
+            self._hide_settings()
             
             messagebox.showinfo("Settings", "Settings saved successfully. Some changes may require restarting the application.")
         except Exception as e:
@@ -486,20 +743,98 @@ class MainApplication(ttk.Frame):
         self.status_var.set(message)
     
     def run_in_thread(self, func, args=(), on_complete=None):
-        """Run a function in a separate thread."""
-        def thread_func():
+        """
+        Queue a function to run on the background worker pool.
+        
+        Up to BACKGROUND_WORKERS jobs run at once, so a long MT5 fetch or import
+        does not hold up other work, and no thread is started per call.
+        
+        Args:
+            func (callable): The function to run
+            args (tuple, optional): Positional arguments for func
+            on_complete (callable, optional): Called on the main thread with func's result
+        """
+        self._work_q.put((func, args, on_complete))
+    
+    def post_to_ui(self, func, *args):
+        """
+        Run a function on the main thread; safe to call from any thread.
+        
+        Calls are delivered in order by the results poll, so several updates
+        from a worker are handled in a single main loop wakeup.
+        
+        Args:
+            func (callable): The function to call
+            *args: Positional arguments for func
+        """
+        self._results.put(partial(func, *args))
+    
+    def _worker_loop(self):
+        """Run queued jobs until the None sentinel is received."""
+        while True:
+            job = self._work_q.get()
+            if job is None:
+                break
+            
+            func, args, on_complete = job
+            callback = None
             try:
                 result = func(*args)
                 if on_complete:
-                    self.master.after(0, lambda: on_complete(result))
+                    callback = partial(on_complete, result)
             except Exception as e:
                 logger.error(f"Error in thread: {e}")
-                self.master.after(0, lambda: messagebox.showerror("Error", str(e)))
+                callback = partial(messagebox.showerror, "Error", str(e))
+            
+            # Jobs are long and infrequent, so none keeps a database open once it is done
+            close_connection()
+            
+            # Hand the callback to the main thread, which drains the results queue
+            if callback:
+                self._results.put(callback)
+    
+    def _drain_results(self):
+        """Run completed job callbacks on the main thread and reschedule the poll."""
+        while True:
+            try:
+                callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in background job callback: {e}")
         
-        t = threading.Thread(target=thread_func)
-        t.daemon = True
-        t.start()
-        return t
+        self._drain_id = self.master.after(self.RESULT_POLL_MS, self._drain_results)
+    
+    def schedule_config_save(self):
+        """Write the config shortly, replacing any write that is still pending."""
+        if self._save_after_id:
+            self.master.after_cancel(self._save_after_id)
+        self._save_after_id = self.master.after(self.CONFIG_SAVE_DELAY_MS, self._flush_config)
+    
+    def _flush_config(self):
+        """Save a snapshot of the config on the background worker."""
+        self._save_after_id = None
+        
+        # Copied here on the Tk thread, which is the only one that edits the live config
+        self._config_save_seq += 1
+        self.run_in_thread(self._save_config_snapshot, args=(copy.deepcopy(self.config), self._config_save_seq))
+    
+    def _save_config_snapshot(self, snapshot, seq):
+        """
+        Write a config snapshot unless a newer one has already been written.
+        
+        Args:
+            snapshot (dict): A copy of the config taken on the Tk thread
+            seq (int): The snapshot's number, increasing with every save request
+        """
+        with self._config_save_lock:
+            if seq <= self._config_saved_seq:
+                return
+            save_config(snapshot)
+            self._config_saved_seq = seq
     
     def quit_app(self):
         """Quit the application."""
@@ -508,6 +843,33 @@ class MainApplication(ttk.Frame):
         y = self.master.winfo_y()
         self.config['gui']['window_position']['x'] = x
         self.config['gui']['window_position']['y'] = y
-        save_config(self.config)
+        
+        # Replace any pending debounced save with a final snapshot, taken before the window closes
+        if self._save_after_id:
+            self.master.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        self._config_save_seq += 1
+        final_save = threading.Thread(
+            target=self._save_config_snapshot,
+            args=(copy.deepcopy(self.config), self._config_save_seq),
+            name="config-final-save"
+        )
+        
+        # Stop the workers; they are daemons, so a job still running cannot keep the process alive
+        for _ in self._workers:
+            self._work_q.put(None)
+        self.master.after_cancel(self._drain_id)
         
         self.master.destroy()
+        
+        # Close the Tk thread's cached database connection
+        close_connection()
+        
+        # Write the final snapshot after the window is gone; the writer is not a daemon and is
+        # joined at exit, and its sequence number supersedes any save still queued on a worker
+        final_save.start()
+        atexit.register(final_save.join)
+        
+        # Stop the backtest workers and their cancel-event manager once the dialogs
+        # using them have been destroyed
+        shutdown_backtest_workers()
@@ -7,32 +7,43 @@ and data fetching functions.
 
 import logging
 import os
+import re
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import threading
+from collections import OrderedDict
+from functools import partial
 
 from src.utils.config import get_config
-from src.data.mt5_connector import (
-    fetch_and_store_data_for_symbol,
-    get_available_symbols, 
-    initialize_mt5, 
-    shutdown_mt5,
-    validate_symbol
-)
 from src.data.database import (
     get_db_path,
     init_db
 )
-from src.analysis.news import (
-    import_news_from_excel,
-    analyze_news_impact
-)
 
 logger = logging.getLogger(__name__)
 
+# Symbols offered in the dropdown: anything quoting a major currency, plus metals
+_FX_RE = re.compile(r'USD|EUR|GBP|JPY|AUD|CAD|CHF|NZD')
+_COMMODITIES = ("XAUUSD", "XAGUSD", "XPDUSD", "XPTUSD")
+
+# Recent news analysis results keyed by (db path, symbol, database file signature)
+_ANALYSIS_CACHE = OrderedDict()
+_ANALYSIS_CACHE_SIZE = 8
+
+def _db_signature(db_path):
+    """
+    Get the modification times of a database and its WAL file.
+    
+    Args:
+        db_path (str): Path to the database file
+        
+    Returns:
+        tuple: (database mtime, WAL mtime or None)
+    """
+    wal_path = f"{db_path}-wal"
+    wal_mtime = os.path.getmtime(wal_path) if os.path.exists(wal_path) else None
+    return (os.path.getmtime(db_path), wal_mtime)
+
 class SetupPanel(ttk.Frame):
     """Setup panel for database creation and data import."""
     
@@ -47,6 +58,9 @@ class SetupPanel(ttk.Frame):
         self.current_db_path = None
         self.current_symbol = None
         
+        # Held while a setup job is queued or running so repeated clicks are ignored
+        self._busy = threading.Lock()
+        
         # Create UI
         self.create_ui()
     
@@ -132,55 +146,99 @@ class SetupPanel(ttk.Frame):
         self.news_results_frame = ttk.LabelFrame(content_frame, text="News Analysis Results")
         self.news_results_frame.grid(row=7, column=0, columnspan=3, sticky=tk.NSEW, padx=5, pady=10)
         
-        # Create an empty canvas for news analysis chart
-        self.news_fig = plt.Figure(figsize=(8, 4), dpi=100)
-        self.news_canvas = FigureCanvasTkAgg(self.news_fig, self.news_results_frame)
-        self.news_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # The news analysis chart is created by _show_news_analysis on first use
+        self.news_fig = None
+        self.news_canvas = None
+        self._news_ax = None
+        self._up_bars = ()
+        self._down_bars = ()
         
         # Make the grid expandable
         content_frame.grid_columnconfigure(1, weight=1)
         content_frame.grid_rowconfigure(7, weight=1)
     
+    def _job_running(self):
+        """
+        Check whether a setup job is already queued or running.
+        
+        Returns:
+            bool: True if a job is in progress, False otherwise
+        """
+        if self._busy.locked():
+            logger.info("Setup job already in progress; ignoring request")
+            return True
+        return False
+    
+    def _run_exclusive(self, job):
+        """
+        Run a job on the application's background pool while holding the busy lock.
+        
+        Only one setup job runs at a time, while other background jobs such as
+        news checks and config saves keep running on the pool's other worker.
+        
+        Args:
+            job (callable): The job to run
+        """
+        self._busy.acquire()
+        
+        def _run():
+            try:
+                job()
+            finally:
+                self._busy.release()
+        
+        self.main_app.run_in_thread(_run)
+    
     def refresh_symbols(self):
         """Refresh the symbols list from MetaTrader 5."""
+        if self._job_running():
+            return
+        
         # Start the progress bar
         self.progress_bar.start()
         self.progress_var.set("Connecting to MetaTrader 5...")
         
         def _refresh():
             try:
+                # Imported on the worker so MetaTrader5 is not loaded at startup
+                from src.data.mt5_connector import get_available_symbols, initialize_mt5, shutdown_mt5
+                
                 if initialize_mt5():
                     symbols = get_available_symbols()
                     shutdown_mt5()
                     
                     if symbols:
                         # Update GUI on main thread
-                        self.after(0, lambda: self._update_symbols(symbols))
+                        self.main_app.post_to_ui(self._update_symbols, symbols)
                     else:
-                        self.after(0, lambda: messagebox.showerror("Error", "Failed to get symbols from MetaTrader 5"))
+                        self.main_app.post_to_ui(messagebox.showerror, "Error", "Failed to get symbols from MetaTrader 5")
                 else:
-                    self.after(0, lambda: messagebox.showerror("Error", "Failed to initialize MetaTrader 5"))
+                    self.main_app.post_to_ui(messagebox.showerror, "Error", "Failed to initialize MetaTrader 5")
             except Exception as e:
                 logger.error(f"Error refreshing symbols: {e}")
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to refresh symbols: {e}"))
+                self.main_app.post_to_ui(messagebox.showerror, "Error", f"Failed to refresh symbols: {e}")
             finally:
                 # Stop progress bar on main thread
-                self.after(0, self.progress_bar.stop)
-                self.after(0, lambda: self.progress_var.set("Ready"))
+                self.main_app.post_to_ui(self._finish_progress, "Ready")
         
-        # Run in a separate thread
-        threading.Thread(target=_refresh).start()
+        # Run on the application's background worker
+        self._run_exclusive(_refresh)
+    
+    def _finish_progress(self, message=None):
+        """Stop the progress bar and optionally set the progress text."""
+        self.progress_bar.stop()
+        if message is not None:
+            self.progress_var.set(message)
     
     def _update_symbols(self, symbols):
         """Update the symbols dropdown."""
         # Filter for forex and common symbols
-        forex_symbols = [s for s in symbols if any(pair in s for pair in ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD"])]
+        forex_symbols = [s for s in symbols if _FX_RE.search(s)]
         
         # Add commodity symbols
-        commodities = ["XAUUSD", "XAGUSD", "XPDUSD", "XPTUSD"]
-        for commodity in commodities:
-            if commodity in symbols and commodity not in forex_symbols:
-                forex_symbols.append(commodity)
+        symbols_set = set(symbols)
+        forex_set = set(forex_symbols)
+        forex_symbols.extend(c for c in _COMMODITIES if c in symbols_set and c not in forex_set)
         
         # Update combobox
         self.symbol_combo['values'] = forex_symbols
@@ -192,6 +250,9 @@ class SetupPanel(ttk.Frame):
     
     def create_database(self):
         """Create or update the database."""
+        if self._job_running():
+            return
+        
         symbol = self.symbol_var.get()
         
         if not symbol:
@@ -223,11 +284,13 @@ class SetupPanel(ttk.Frame):
         
         def _create_db():
             try:
+                from src.data.mt5_connector import fetch_and_store_data_for_symbol
+                
                 # Initialize the database
                 init_db(db_path)
                 
                 # Update progress
-                self.after(0, lambda: self.progress_var.set(f"Downloading data for {symbol}..."))
+                self.main_app.post_to_ui(self.progress_var.set, f"Downloading data for {symbol}...")
                 
                 # Fetch and store data
                 result = fetch_and_store_data_for_symbol(symbol, db_path, selected_timeframes, history_days)
@@ -238,24 +301,24 @@ class SetupPanel(ttk.Frame):
                     self.current_symbol = symbol
                     
                     # Update status
-                    self.after(0, lambda: self.progress_var.set(f"Database for {symbol} created/updated successfully"))
+                    self.main_app.post_to_ui(self.progress_var.set, f"Database for {symbol} created/updated successfully")
                     
                     # Notify parent
-                    self.after(0, lambda: self.on_database_created(db_path, symbol))
+                    self.main_app.post_to_ui(self.on_database_created, db_path, symbol)
                     
                     # Show success message
-                    self.after(0, lambda: messagebox.showinfo("Success", f"Database for {symbol} created/updated successfully"))
+                    self.main_app.post_to_ui(messagebox.showinfo, "Success", f"Database for {symbol} created/updated successfully")
                 else:
-                    self.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch data for {symbol}"))
+                    self.main_app.post_to_ui(messagebox.showerror, "Error", f"Failed to fetch data for {symbol}")
             except Exception as e:
                 logger.error(f"Error creating database: {e}")
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to create database: {e}"))
+                self.main_app.post_to_ui(messagebox.showerror, "Error", f"Failed to create database: {e}")
             finally:
                 # Stop progress bar
-                self.after(0, self.progress_bar.stop)
+                self.main_app.post_to_ui(self._finish_progress)
         
-        # Run in a separate thread
-        threading.Thread(target=_create_db).start()
+        # Run on the application's background worker
+        self._run_exclusive(_create_db)
     
     def on_database_created(self, db_path, symbol):
         """Handle database creation completion."""
@@ -267,7 +330,7 @@ class SetupPanel(ttk.Frame):
         self.main_app.update_status(f"Database opened: {db_path}")
         
         # Notify main app's backtest panel
-        self.main_app.backtest_panel.on_database_opened(db_path, symbol)
+        self.main_app.notify_database_opened(db_path, symbol, panels=("backtest_panel",))
     
     def on_database_opened(self, db_path, symbol):
         """Handle when a database is opened."""
@@ -295,11 +358,13 @@ class SetupPanel(ttk.Frame):
             
             # Update config
             self.config['news']['excel_path'] = filepath
-            from src.utils.config import save_config
-            save_config(self.config)
+            self.main_app.schedule_config_save()
     
     def import_news(self):
         """Import news data from Excel."""
+        if self._job_running():
+            return
+        
         if not self.current_db_path:
             messagebox.showerror("Error", "Please open or create a database first")
             return
@@ -317,25 +382,30 @@ class SetupPanel(ttk.Frame):
         # Import in a separate thread
         def _import_news():
             try:
+                from src.analysis.news import import_news_from_excel
+                
                 # Import news data
                 success = import_news_from_excel(excel_path, self.current_db_path)
                 
                 if success:
-                    self.after(0, lambda: self.progress_var.set("News data imported successfully"))
-                    self.after(0, lambda: messagebox.showinfo("Success", "News data imported successfully"))
+                    self.main_app.post_to_ui(self.progress_var.set, "News data imported successfully")
+                    self.main_app.post_to_ui(messagebox.showinfo, "Success", "News data imported successfully")
                 else:
-                    self.after(0, lambda: messagebox.showerror("Error", "Failed to import news data"))
+                    self.main_app.post_to_ui(messagebox.showerror, "Error", "Failed to import news data")
             except Exception as e:
                 logger.error(f"Error importing news data: {e}")
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to import news data: {e}"))
+                self.main_app.post_to_ui(messagebox.showerror, "Error", f"Failed to import news data: {e}")
             finally:
                 # Stop progress bar
-                self.after(0, self.progress_bar.stop)
+                self.main_app.post_to_ui(self._finish_progress)
         
-        threading.Thread(target=_import_news).start()
+        self._run_exclusive(_import_news)
     
     def analyze_news(self):
         """Analyze news impact."""
+        if self._job_running():
+            return
+        
         if not self.current_db_path:
             messagebox.showerror("Error", "Please open or create a database first")
             return
@@ -347,62 +417,88 @@ class SetupPanel(ttk.Frame):
         # Analyze in a separate thread
         def _analyze_news():
             try:
-                # Analyze news impact
-                results = analyze_news_impact(self.current_db_path, self.current_symbol)
+                from src.analysis.news import analyze_news_impact
+                
+                # Analyze news impact, reusing the last result while the database is unchanged
+                key = (self.current_db_path, self.current_symbol, _db_signature(self.current_db_path))
+                results = _ANALYSIS_CACHE.get(key)
+                if results is None:
+                    results = analyze_news_impact(self.current_db_path, self.current_symbol)
+                    _ANALYSIS_CACHE[key] = results
+                    if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_SIZE:
+                        _ANALYSIS_CACHE.popitem(last=False)
+                else:
+                    _ANALYSIS_CACHE.move_to_end(key)
                 
                 if not results.empty:
                     # Update GUI on main thread
-                    self.after(0, lambda: self._show_news_analysis(results))
-                    self.after(0, lambda: self.progress_var.set("News analysis completed"))
+                    self.main_app.post_to_ui(self._show_news_analysis, results)
+                    self.main_app.post_to_ui(self.progress_var.set, "News analysis completed")
                 else:
-                    self.after(0, lambda: messagebox.showinfo("Analysis", "No significant news impact found"))
-                    self.after(0, lambda: self.progress_var.set("No significant news impact found"))
+                    self.main_app.post_to_ui(messagebox.showinfo, "Analysis", "No significant news impact found")
+                    self.main_app.post_to_ui(self.progress_var.set, "No significant news impact found")
             except Exception as e:
                 logger.error(f"Error analyzing news impact: {e}")
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to analyze news impact: {e}"))
+                self.main_app.post_to_ui(messagebox.showerror, "Error", f"Failed to analyze news impact: {e}")
             finally:
                 # Stop progress bar
-                self.after(0, self.progress_bar.stop)
+                self.main_app.post_to_ui(self._finish_progress)
         
-        threading.Thread(target=_analyze_news).start()
+        self._run_exclusive(_analyze_news)
     
     def _show_news_analysis(self, results):
         """Display news analysis results."""
-        # Clear the previous figure
-        self.news_fig.clear()
-        
-        # Create a new subplot
-        ax = self.news_fig.add_subplot(111)
+        # Create the chart the first time results are shown
+        if self.news_fig is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            
+            self.news_fig = Figure(figsize=(8, 4), dpi=100)
+            self.news_canvas = FigureCanvasTkAgg(self.news_fig, self.news_results_frame)
+            self.news_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Sort by average movement
         results_sorted = results.sort_values(by='avg_movement', ascending=False).head(10)
         
-        # Plot the results
         bar_width = 0.35
         index = range(len(results_sorted))
         
-        # Plot upward and downward average movements
-        ax.bar(index, results_sorted['upward_mean'], bar_width, label='Upward Pips', color='green', alpha=0.7)
-        ax.bar([i + bar_width for i in index], results_sorted['downward_mean'], bar_width, label='Downward Pips', color='red', alpha=0.7)
-        
-        # Add labels and title
-        ax.set_xlabel('News Event')
-        ax.set_ylabel('Average Pips Movement')
-        ax.set_title(f'Top 10 News Events by Price Impact ({self.current_symbol})')
-        ax.set_xticks([i + bar_width/2 for i in index])
-        
         # Rotate labels for readability
         news_names = results_sorted['news'].tolist()
         shortened_names = [name[:20] + '...' if len(name) > 20 else name for name in news_names]
-        ax.set_xticklabels(shortened_names, rotation=45, ha='right')
         
-        ax.legend()
+        if self._news_ax is not None and len(self._up_bars) == len(results_sorted):
+            # Same number of events: update the existing bars in place
+            ax = self._news_ax
+            for bar, height in zip(self._up_bars, results_sorted['upward_mean']):
+                bar.set_height(height)
+            for bar, height in zip(self._down_bars, results_sorted['downward_mean']):
+                bar.set_height(height)
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            # Rebuild the chart
+            self.news_fig.clear()
+            ax = self._news_ax = self.news_fig.add_subplot(111)
+            
+            # Plot upward and downward average movements
+            self._up_bars = ax.bar(index, results_sorted['upward_mean'], bar_width, label='Upward Pips', color='green', alpha=0.7)
+            self._down_bars = ax.bar([i + bar_width for i in index], results_sorted['downward_mean'], bar_width, label='Downward Pips', color='red', alpha=0.7)
+            
+            # Add labels
+            ax.set_xlabel('News Event')
+            ax.set_ylabel('Average Pips Movement')
+            ax.set_xticks([i + bar_width/2 for i in index])
+            ax.legend()
+        
+        ax.set_title(f'Top 10 News Events by Price Impact ({self.current_symbol})')
+        ax.set_xticklabels(shortened_names, rotation=45, ha='right')
         
         # Adjust layout
         self.news_fig.tight_layout()
         
         # Redraw the canvas
-        self.news_canvas.draw()
+        self.news_canvas.draw_idle()
         
         # Display results in a popup
         results_window = tk.Toplevel(self)
@@ -445,20 +541,19 @@ class SetupPanel(ttk.Frame):
         scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
         tree.configure(yscroll=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # Insert data
-        for i, row in results.iterrows():
-            tree.insert("", tk.END, values=(
-                row['news'],
-                row['typical_impact'],
-                row['upward_count'],
-                f"{row['upward_mean']:.2f}",
-                row['downward_count'],
-                f"{row['downward_mean']:.2f}",
-                row['total_count'],
-                f"{row['avg_movement']:.2f}"
-            ))
+        # Format the averages column-wise, then insert plain row tuples while the tree is unmanaged
+        formatted = results.assign(
+            upward_mean_s=results['upward_mean'].map('{:.2f}'.format),
+            downward_mean_s=results['downward_mean'].map('{:.2f}'.format),
+            avg_movement_s=results['avg_movement'].map('{:.2f}'.format)
+        )
+        row_columns = ['news', 'typical_impact', 'upward_count', 'upward_mean_s', 'downward_count', 'downward_mean_s', 'total_count', 'avg_movement_s']
+        for row in formatted[row_columns].itertuples(index=False, name=None):
+            tree.insert("", tk.END, values=row)
+        
+        # Attach the populated tree so it is laid out once
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Add export button
         def export_to_csv():
@@ -471,8 +566,14 @@ class SetupPanel(ttk.Frame):
             )
             
             if filepath:
-                results.to_csv(filepath, index=False)
-                messagebox.showinfo("Export", f"News analysis exported to {filepath}")
+                # Write on the background worker in chunks; confirm on the main thread
+                def _exported(_result):
+                    messagebox.showinfo("Export", f"News analysis exported to {filepath}")
+                
+                self.main_app.run_in_thread(
+                    partial(results.to_csv, filepath, index=False, chunksize=50_000),
+                    on_complete=_exported
+                )
         
         export_frame = ttk.Frame(results_window)
         export_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -5,10 +5,17 @@ This module handles the application configuration,
 including default settings and user preferences.
 """
 
+import copy
 import os
 import json
 import logging
 
+# orjson is optional; it serializes the config much faster than the stdlib when present
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Default configuration
 DEFAULT_CONFIG = {
     "database": {
@@ -57,7 +64,8 @@ DEFAULT_CONFIG = {
         "window_position": {
             "x": 100,
             "y": 100
-        }
+        },
+        "plot_refresh_stride": 10  # Batch backtest entries between progress updates
     },
     "news": {
         "excel_path": "",
@@ -66,45 +74,104 @@ DEFAULT_CONFIG = {
     }
 }
 
+CONFIG_PATH = 'config/settings.json'
+
+# Private deep copy of the defaults taken at import, so later edits to the
+# loaded config can never leak back into the template
+_DEFAULT_TEMPLATE = copy.deepcopy(DEFAULT_CONFIG)
+
 # Global variable to hold the configuration
 _CONFIG = None
 
+# (st_mtime_ns, st_size) of the settings file when it was last read or written
+_MTIME = None
+
+# Canonical JSON of the settings last read from or written to disk
+_SAVED_SNAPSHOT = None
+
+# Per-symbol (pip multiplier, currency ratio), rebuilt whenever the config is reloaded
+_PIP_SETTINGS = {}
+
+def _file_signature(path):
+    """
+    Get a cheap change signature for a file.
+    
+    Args:
+        path (str): Path to the file
+        
+    Returns:
+        tuple or None: (mtime in ns, size), or None if the file is missing
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _snapshot(config):
+    """
+    Serialize a configuration canonically for change detection.
+    
+    Args:
+        config (dict): The configuration
+        
+    Returns:
+        bytes or str: JSON with sorted keys
+    """
+    if orjson is not None:
+        return orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(config, sort_keys=True)
+
 def setup_config():
     """
     Set up the configuration by loading user settings or creating defaults.
     """
-    global _CONFIG
+    global _CONFIG, _MTIME, _SAVED_SNAPSHOT
     logger = logging.getLogger(__name__)
     
     # Create config directory if it doesn't exist
     os.makedirs('config', exist_ok=True)
-    config_path = 'config/settings.json'
+    config_path = CONFIG_PATH
+    
+    # Keep the cached config if the settings file has not changed since it was read
+    signature = _file_signature(config_path)
+    if _CONFIG is not None and signature is not None and signature == _MTIME:
+        # The data directory may have been removed while the app was running
+        os.makedirs(_CONFIG['database']['path'], exist_ok=True)
+        return
     
     # Load existing config or create default
-    if os.path.exists(config_path):
+    if signature is not None:
         try:
             with open(config_path, 'r') as f:
                 user_config = json.load(f)
                 
             # Merge with default config to ensure all keys exist
-            _CONFIG = DEFAULT_CONFIG.copy()
+            _CONFIG = copy.deepcopy(_DEFAULT_TEMPLATE)
             _update_dict_recursive(_CONFIG, user_config)
+            _MTIME = signature
+            _SAVED_SNAPSHOT = _snapshot(user_config)
             logger.info("Configuration loaded from settings.json")
         except Exception as e:
             logger.error(f"Error loading configuration: {e}")
-            _CONFIG = DEFAULT_CONFIG.copy()
+            _CONFIG = copy.deepcopy(_DEFAULT_TEMPLATE)
             logger.info("Using default configuration")
     else:
-        _CONFIG = DEFAULT_CONFIG.copy()
+        _CONFIG = copy.deepcopy(_DEFAULT_TEMPLATE)
         
         # Save default config
         try:
             with open(config_path, 'w') as f:
                 json.dump(_CONFIG, f, indent=2)
+            _MTIME = _file_signature(config_path)
+            _SAVED_SNAPSHOT = _snapshot(_CONFIG)
             logger.info("Default configuration saved to settings.json")
         except Exception as e:
             logger.error(f"Error saving default configuration: {e}")
     
+    # Derived per-symbol lookups must follow the reloaded config
+    _PIP_SETTINGS.clear()
+    
     # Create data directory if it doesn't exist
     os.makedirs(_CONFIG['database']['path'], exist_ok=True)
 
@@ -112,6 +179,9 @@ def get_config():
     """
     Get the current configuration.
     
+    The settings file is only read on the first call; later calls return the
+    same in-memory dictionary, so callers can fetch it freely.
+    
     Returns:
         dict: The current configuration dictionary
     """
@@ -119,19 +189,67 @@ def get_config():
         setup_config()
     return _CONFIG
 
+def get_pip_settings(symbol):
+    """
+    Get the pip conversion factors for a symbol.
+    
+    Args:
+        symbol (str): The trading symbol
+        
+    Returns:
+        tuple: (pip multiplier, currency ratio), defaulting to (10000, 0.0001)
+    """
+    settings = _PIP_SETTINGS.get(symbol)
+    if settings is None:
+        trading = get_config()['trading']
+        settings = (
+            trading['pips_multiplication'].get(symbol, 10000),
+            trading['currency_ratios'].get(symbol, 0.0001)
+        )
+        _PIP_SETTINGS[symbol] = settings
+    return settings
+
+def invalidate_pip_settings():
+    """
+    Drop the cached per-symbol pip settings after the config was edited in place.
+    """
+    _PIP_SETTINGS.clear()
+
 def save_config(config):
     """
     Save the current configuration to the settings file.
     
+    The file is only rewritten when the configuration differs from what was
+    last read or written, and the write goes through a temporary file that is
+    swapped in atomically.
+    
     Args:
         config (dict): The configuration to save
     """
+    global _MTIME, _SAVED_SNAPSHOT
     logger = logging.getLogger(__name__)
-    config_path = 'config/settings.json'
+    config_path = CONFIG_PATH
+    
+    # The saved values may differ from the ones the pip settings were derived from
+    _PIP_SETTINGS.clear()
     
     try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        snapshot = _snapshot(config)
+        if snapshot == _SAVED_SNAPSHOT and _file_signature(config_path) == _MTIME:
+            logger.debug("Configuration unchanged; skipping save")
+            return
+        
+        tmp_path = f"{config_path}.tmp"
+        if orjson is not None:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps(config, indent=2))
+        os.replace(tmp_path, config_path)
+        
+        _MTIME = _file_signature(config_path)
+        _SAVED_SNAPSHOT = snapshot
         logger.info("Configuration saved to settings.json")
     except Exception as e:
         logger.error(f"Error saving configuration: {e}")
@@ -140,12 +258,19 @@ def _update_dict_recursive(base_dict, update_dict):
     """
     Update a dictionary recursively.
     
+    Nested levels are merged with an explicit stack rather than recursive calls.
+    
     Args:
         base_dict (dict): The base dictionary to update
         update_dict (dict): The dictionary with new values
     """
-    for key, value in update_dict.items():
-        if key in base_dict and isinstance(base_dict[key], dict) and isinstance(value, dict):
-            _update_dict_recursive(base_dict[key], value)
-        else:
-            base_dict[key] = value
+    stack = [(base_dict, update_dict)]
+    while stack:
+        base, update = stack.pop()
+        for key, value in update.items():
+            if isinstance(value, dict):
+                current = base.get(key)
+                if isinstance(current, dict):
+                    stack.append((current, value))
+                    continue
+            base[key] = value
@@ -5,10 +5,65 @@ This module sets up and configures the application logging system to provide
 detailed information about application events and errors.
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Handlers built by setup_logging, keyed by (destination, level), reused on later calls
+_HANDLER_CACHE = {}
+_SETUP_LOCK = threading.Lock()
+
+# Emitting threads only enqueue records; a single listener thread does the disk writes
+_LOG_QUEUE = queue.SimpleQueue()
+_QUEUE_HANDLER = QueueHandler(_LOG_QUEUE)
+_LISTENER = None
+
+def _start_listener(handler):
+    """
+    Point the queue listener at a file handler, replacing any previous listener.
+    
+    Args:
+        handler (Handler): The handler that writes queued records
+    """
+    global _LISTENER
+    if _LISTENER is not None:
+        if _LISTENER.handlers == (handler,):
+            return
+        _LISTENER.stop()
+    
+    _LISTENER = QueueListener(_LOG_QUEUE, handler, respect_handler_level=True)
+    _LISTENER.start()
+
+def _stop_listener():
+    """Flush queued records and stop the listener thread, if one is running."""
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
+
+atexit.register(_stop_listener)
+
+def _cached_handler(key, factory):
+    """
+    Get a previously built handler or build and cache a new one.
+    
+    Args:
+        key (tuple): The (destination, level) cache key
+        factory (callable): Builds the handler when none is cached
+        
+    Returns:
+        Handler: The logging handler
+    """
+    handler = _HANDLER_CACHE.get(key)
+    if handler is None:
+        handler = factory()
+        _HANDLER_CACHE[key] = handler
+    
+    return handler
 
 def setup_logging(log_file=None, level=logging.INFO):
     """
@@ -24,34 +79,48 @@ def setup_logging(log_file=None, level=logging.INFO):
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir, exist_ok=True)
     
-    # Create a formatter for detailed output
-    formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] %(message)s'
-    )
-    
-    # Configure the root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(level)
+    # Create a formatter; the line number is always kept so the log file stays useful for
+    # post-mortems, and the calling function is added at DEBUG level
+    if level > logging.DEBUG:
+        fmt = '[{asctime}] {levelname} [{name}:{lineno}] {message}'
+    else:
+        fmt = '[{asctime}] {levelname} [{name}.{funcName}:{lineno}] {message}'
+    formatter = logging.Formatter(fmt, style='{')
     
-    # Clear existing handlers (in case function is called multiple times)
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
+    def _console_handler():
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(formatter)
+        handler.setLevel(level)
+        return handler
     
-    # Add a console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    console_handler.setLevel(level)
-    root_logger.addHandler(console_handler)
-    
-    # Add a file handler if a log file is specified
-    if log_file:
+    def _file_handler():
         # Use RotatingFileHandler to limit file size
-        file_handler = RotatingFileHandler(
+        handler = RotatingFileHandler(
             log_file, maxBytes=10*1024*1024, backupCount=5
         )
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(level)
-        root_logger.addHandler(file_handler)
+        handler.setFormatter(formatter)
+        handler.setLevel(level)
+        return handler
+    
+    with _SETUP_LOCK:
+        # Configure the root logger
+        root_logger = logging.getLogger()
+        root_logger.setLevel(level)
+        
+        # Clear existing handlers (in case function is called multiple times)
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        
+        # Add a console handler
+        root_logger.addHandler(_cached_handler(('console', level), _console_handler))
+        
+        # Add a file handler if a log file is specified; records reach it through the queue
+        if log_file:
+            _start_listener(_cached_handler((log_file, level), _file_handler))
+            _QUEUE_HANDLER.setLevel(level)
+            root_logger.addHandler(_QUEUE_HANDLER)
+        else:
+            _stop_listener()
     
     # Suppress excessive logging from third-party libraries
     logging.getLogger('matplotlib').setLevel(logging.WARNING)
@@ -6,22 +6,37 @@ which is crucial for accurate backtesting and data analysis.
 """
 
 import logging
-from datetime import datetime, timedelta
-import pytz
+from datetime import datetime, timedelta, time as dt_time
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
 from src.utils.config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Session boundaries in the application timezone
+LONDON_START = dt_time(15, 0)
+LONDON_END = dt_time(20, 0)
+NEW_YORK_START = dt_time(20, 0)
+NEW_YORK_END = dt_time(5, 0)
+TOKYO_START = dt_time(5, 0)
+TOKYO_END = dt_time(15, 0)
+
 def get_mt5_timezone():
     """
     Get the timezone configured for MetaTrader 5 data.
     
     Returns:
-        pytz.timezone: The configured timezone
+        ZoneInfo: The configured timezone
     """
     config = get_config()
-    timezone_str = config['mt5']['timezone']
-    return pytz.timezone(timezone_str)
+    
+    # ZoneInfo caches instances by key, so repeated lookups are cheap
+    return ZoneInfo(config['mt5']['timezone'])
 
 def normalize_time_for_m15(time_obj):
     """
@@ -33,14 +48,11 @@ def normalize_time_for_m15(time_obj):
     Returns:
         datetime: The normalized datetime object
     """
-    # Adjust to the previous 15-minute mark
-    minutes = time_obj.minute
-    adjusted_minutes = (minutes // 15) * 15
-    
-    return time_obj.replace(
-        minute=adjusted_minutes,
-        second=0,
-        microsecond=0
+    # Step back to the previous 15-minute mark in one subtraction
+    return time_obj - timedelta(
+        minutes=time_obj.minute % 15,
+        seconds=time_obj.second,
+        microseconds=time_obj.microsecond
     )
 
 def format_datetime_for_db(dt):
@@ -53,7 +65,23 @@ def format_datetime_for_db(dt):
     Returns:
         str: The formatted datetime string
     """
-    return dt.strftime('%Y-%m-%d %H:%M:%S')
+    # Aware datetimes compare equal across zones, so only naive values can share a cache entry
+    if dt.tzinfo is None:
+        return _format_naive_for_db(dt)
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+
+@lru_cache(maxsize=4096)
+def _format_naive_for_db(dt):
+    """
+    Format a naive datetime for database storage, memoized per value.
+    
+    Args:
+        dt (datetime): The naive datetime to format
+        
+    Returns:
+        str: The formatted datetime string
+    """
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
 
 def parse_db_datetime(datetime_str):
     """
@@ -65,6 +93,14 @@ def parse_db_datetime(datetime_str):
     Returns:
         datetime: The parsed datetime object
     """
+    # Fixed-width 'YYYY-MM-DD HH:MM:SS' is sliced directly; anything else goes through strptime
+    if (len(datetime_str) == 19 and datetime_str[4] == datetime_str[7] == '-'
+            and datetime_str[10] == ' ' and datetime_str[13] == datetime_str[16] == ':'
+            and datetime_str[0:4].isdigit() and datetime_str[5:7].isdigit() and datetime_str[8:10].isdigit()
+            and datetime_str[11:13].isdigit() and datetime_str[14:16].isdigit() and datetime_str[17:19].isdigit()):
+        return datetime(int(datetime_str[0:4]), int(datetime_str[5:7]), int(datetime_str[8:10]),
+                        int(datetime_str[11:13]), int(datetime_str[14:16]), int(datetime_str[17:19]))
+    
     return datetime.strptime(datetime_str, '%Y-%m-%d %H:%M:%S')
 
 def format_display_date(dt):
@@ -77,7 +113,23 @@ def format_display_date(dt):
     Returns:
         str: The formatted date string
     """
-    return dt.strftime('%d/%m/%y')
+    # Keyed by calendar day so every time within the same day shares one entry
+    return _display_date(dt.year, dt.month, dt.day)
+
+@lru_cache(maxsize=4096)
+def _display_date(year, month, day):
+    """
+    Format a calendar day for display, memoized per day.
+    
+    Args:
+        year (int): The year
+        month (int): The month
+        day (int): The day of the month
+        
+    Returns:
+        str: The formatted date string
+    """
+    return f"{day:02d}/{month:02d}/{year % 100:02d}"
 
 def format_display_time(dt):
     """
@@ -89,7 +141,10 @@ def format_display_time(dt):
     Returns:
         str: The formatted time string
     """
-    return dt.strftime('%H:%M')
+    return _TIME_STRS[dt.hour * 60 + dt.minute]
+
+# Display string for every minute of the day, indexed by hour * 60 + minute
+_TIME_STRS = tuple(f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60))
 
 def get_session_for_time(time_obj):
     """
@@ -101,30 +156,34 @@ def get_session_for_time(time_obj):
     Returns:
         str: The session name ('London', 'New York', 'Tokyo', or 'Unknown')
     """
-    # Extract the time component if a datetime is provided
-    if isinstance(time_obj, datetime):
-        time_only = time_obj.time()
-    else:
-        time_only = time_obj
-    
-    # Define session times
-    london_start = datetime.strptime('15:00', '%H:%M').time()
-    london_end = datetime.strptime('20:00', '%H:%M').time()
-    new_york_start = datetime.strptime('20:00', '%H:%M').time()
-    new_york_end = datetime.strptime('05:00', '%H:%M').time()
-    tokyo_start = datetime.strptime('05:00', '%H:%M').time()
-    tokyo_end = datetime.strptime('15:00', '%H:%M').time()
-    
-    # Determine the session
-    if london_start <= time_only < london_end:
+    # Both datetime and time expose hour/minute, and every boundary falls on a whole minute
+    return _SESSION_BY_MINUTE[time_obj.hour * 60 + time_obj.minute]
+
+def _session_for_clock_time(time_only):
+    """
+    Determine the trading session for a time of day from the session boundaries.
+    
+    Args:
+        time_only (time): The time of day to check
+        
+    Returns:
+        str: The session name ('London', 'New York', 'Tokyo', or 'Unknown')
+    """
+    if LONDON_START <= time_only < LONDON_END:
         return "London"
-    elif tokyo_start <= time_only < tokyo_end:
+    elif TOKYO_START <= time_only < TOKYO_END:
         return "Tokyo"
-    elif new_york_start <= time_only or time_only < new_york_end:
+    elif NEW_YORK_START <= time_only or time_only < NEW_YORK_END:
         return "New York"
     else:
         return "Unknown"
 
+# Session for every minute of the day, indexed by hour * 60 + minute
+_SESSION_BY_MINUTE = tuple(
+    _session_for_clock_time(dt_time(minute // 60, minute % 60))
+    for minute in range(24 * 60)
+)
+
 def combine_date_and_time(date_str, time_str):
     """
     Combine a date string and time string into a datetime object.
@@ -136,9 +195,45 @@ def combine_date_and_time(date_str, time_str):
     Returns:
         datetime: The combined datetime object
     """
+    # Reject values that cannot match 'dd/mm/yy HH:MM' without raising, e.g. blank or NaN cells
+    if (not isinstance(date_str, str) or not isinstance(time_str, str)
+            or date_str.count('/') != 2 or time_str.count(':') != 1):
+        logger.error("Error combining date and time: unexpected format")
+        logger.error(f"Date: '{date_str}', Time: '{time_str}'")
+        return None
+    
     try:
-        return datetime.strptime(f"{date_str} {time_str}", '%d/%m/%y %H:%M')
+        return _parse_date_and_time(date_str, time_str)
     except ValueError as e:
         logger.error(f"Error combining date and time: {e}")
         logger.error(f"Date: '{date_str}', Time: '{time_str}'")
         return None
+
+@lru_cache(maxsize=1024)
+def _parse_date_and_time(date_str, time_str):
+    """
+    Parse a date string and time string, memoized per pair.
+    
+    Invalid pairs raise, so only successful parses are cached.
+    
+    Args:
+        date_str (str): The date string in format 'dd/mm/yy'
+        time_str (str): The time string in format 'HH:MM'
+        
+    Returns:
+        datetime: The combined datetime object
+        
+    Raises:
+        ValueError: If the pair is not a valid date and time
+    """
+    # Fixed-width 'dd/mm/yy' and 'HH:MM' are built directly; anything else goes through strptime
+    if (len(date_str) == 8 and len(time_str) == 5
+            and date_str[2] == date_str[5] == '/' and time_str[2] == ':'
+            and (date_str[:2] + date_str[3:5] + date_str[6:] + time_str[:2] + time_str[3:]).isdigit()):
+        year = int(date_str[6:8])
+        
+        # Same century pivot as strptime's %y: 69-99 -> 19xx, 00-68 -> 20xx
+        year += 1900 if year >= 69 else 2000
+        return datetime(year, int(date_str[3:5]), int(date_str[0:2]), int(time_str[0:2]), int(time_str[3:5]))
+    
+    return datetime.strptime(f"{date_str} {time_str}", '%d/%m/%y %H:%M')